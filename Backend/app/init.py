@@ -1,7 +1,6 @@
-import os
 import sys
 from pathlib import Path
-from flask import Flask
+from flask import Flask, jsonify
 from flask_cors import CORS
 
 # Add parent directory to path for imports
@@ -10,6 +9,7 @@ sys.path.insert(0, str(Path(__file__).parent))
 from utils import config
 from routes import factcheck_bp
 from routes import image_bp
+from routes import jobs_bp
 
 
 def create_app():
@@ -18,12 +18,21 @@ def create_app():
     # Enable CORS for all routes
     CORS(app, resources={r"/*": {"origins": "*"}})
     
-    os.makedirs(config.UPLOAD_FOLDER, exist_ok=True)
+    # Reject oversized uploads before they are read (margin for multipart overhead)
+    app.config['MAX_CONTENT_LENGTH'] = config.Config.MAX_IMAGE_UPLOAD_BYTES + 64 * 1024
+    
+    @app.errorhandler(413)
+    def request_too_large(e):
+        return jsonify({
+            'error': 'Request too large',
+            'max_bytes': config.Config.MAX_IMAGE_UPLOAD_BYTES
+        }), 413
     
    
     
     app.register_blueprint(factcheck_bp)
     app.register_blueprint(image_bp)
+    app.register_blueprint(jobs_bp)
     
 
     return app
\ No newline at end of file
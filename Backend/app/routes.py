@@ -2,9 +2,9 @@
 
 import sys
 from pathlib import Path
-from flask import Blueprint, request, jsonify
-from werkzeug.utils import secure_filename
-import os
+from flask import Blueprint, Response, request, jsonify, stream_with_context
+import json
+from werkzeug.exceptions import HTTPException
 
 
 # Add parent directory to path for imports
@@ -12,6 +12,87 @@ sys.path.insert(0, str(Path(__file__).parent))
 
 from services.factcheck_service import FactCheckService
 from services.image_verification_service import ImageVerificationService
+from utils.claimreview_index import get_claimreview_index
+from utils.config import Config
+from utils.http_client import get_http_client
+from utils.image_fetcher import ImageFetcher, ImageFetchError
+from utils.image_payload import ImagePayload, InvalidImage
+from utils.llm_gateway import get_llm_gateway
+from utils.jobs import JobManager, JobQueueFull
+
+# Background executor for async verification requests
+job_manager = JobManager(
+    max_workers=Config.JOB_MAX_WORKERS,
+    max_pending=Config.JOB_MAX_PENDING,
+    ttl=Config.JOB_TTL,
+    max_pending_bytes=Config.JOB_MAX_PENDING_BYTES
+)
+
+
+def wants_async(data=None):
+    """
+    Async mode is requested with ?async=true or "async": true in the body
+
+    Ignored (the request runs synchronously) when ASYNC_JOBS_ENABLED is off.
+    """
+    if not Config.ASYNC_JOBS_ENABLED:
+        return False
+    flag = request.args.get('async') or (data or {}).get('async')
+    return str(flag).lower() in ('1', 'true', 'yes')
+
+
+def run_or_submit(kind, is_async, fn, *args):
+    """
+    Run fn now (200 + result) or queue it as a job (202 + job id)
+    
+    Queued jobs hold images as raw bytes, decoded again by the worker: a
+    decoded image is many times its file size. Those bytes count against
+    JOB_MAX_PENDING_BYTES.
+    """
+    if not is_async:
+        return jsonify(fn(*args)), 200
+    
+    args = [arg.data if isinstance(arg, ImagePayload) else arg for arg in args]
+    size = sum(len(arg) for arg in args if isinstance(arg, bytes))
+    
+    try:
+        job = job_manager.submit(kind, fn, *args, size=size)
+    except JobQueueFull as e:
+        return jsonify({
+            'error': 'Too many pending jobs, retry later',
+            'message': str(e)
+        }), 503
+    
+    job['status_url'] = f"/jobs/{job['job_id']}"
+    return jsonify(job), 202
+
+
+def string_field(data, name):
+    """Stripped data[name] ('' if missing); None if data is not an object or the value not a string"""
+    if not isinstance(data, dict):
+        return None
+    value = data.get(name) or ''
+    return value.strip() if isinstance(value, str) else None
+
+
+def sse_response(events):
+    """Stream (event, data) pairs as Server-Sent Events"""
+    
+    def generate():
+        try:
+            for event, data in events:
+                yield f"event: {event}\ndata: {json.dumps(data)}\n\n"
+        finally:
+            events.close()
+    
+    # Closing the response (client gone) closes the stage generator right
+    # away, which stops the pipeline before any further Gemini calls
+    return Response(
+        stream_with_context(generate()),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
 
 factcheck_bp = Blueprint('factcheck', __name__)
 
@@ -25,7 +106,8 @@ def verify_text():
     
     Body:
     {
-        "text": "Claim to verify"
+        "text": "Claim to verify",
+        "async": false          (optional - return a job id instead)
     }
     """
     try:
@@ -43,10 +125,11 @@ def verify_text():
             return jsonify({'error': 'Text cannot be empty'}), 400
         
         # Verify claim
-        result = factcheck_service.verify_text(text)
-        
-        return jsonify(result), 200
+        return run_or_submit('text', wants_async(data), factcheck_service.verify_text, text)
         
+    except HTTPException:
+        # 413 / 400 raised while reading the body keep their status
+        raise
     except Exception as e:
         return jsonify({
             'error': 'Internal server error',
@@ -61,7 +144,8 @@ def verify_url():
     
     Body:
     {
-        "url": "https://example.com/article"
+        "url": "https://example.com/article",
+        "async": false          (optional - return a job id instead)
     }
     """
     try:
@@ -79,10 +163,58 @@ def verify_url():
             return jsonify({'error': 'Invalid URL format'}), 400
         
         # Verify URL
-        result = factcheck_service.verify_url(url)
+        return run_or_submit('url', wants_async(data), factcheck_service.verify_url, url)
+        
+    except HTTPException:
+        # 413 / 400 raised while reading the body keep their status
+        raise
+    except Exception as e:
+        return jsonify({
+            'error': 'Internal server error',
+            'message': str(e)
+        }), 500
+
+
+@factcheck_bp.route('/verify/batch', methods=['POST'])
+def verify_batch():
+    """
+    Verify many claims, sharing searches, scrapes and domain ratings
+    
+    Body:
+    {
+        "claims": ["Claim one", "Claim two", ...],
+        "async": false          (optional - return a job id instead)
+    }
+    
+    Returns results in the same order as "claims".
+    """
+    try:
+        data = request.get_json()
+        
+        if not data or not isinstance(data.get('claims'), list):
+            return jsonify({
+                'error': 'Missing required field: claims',
+                'example': {'claims': ['First claim', 'Second claim']}
+            }), 400
+        
+        claims = [c.strip() for c in data['claims'] if isinstance(c, str) and c.strip()]
+        
+        if not claims:
+            return jsonify({'error': 'Claims cannot be empty'}), 400
+        
+        if len(claims) != len(data['claims']):
+            return jsonify({'error': 'Every claim must be a non-empty string'}), 400
+        
+        if len(claims) > Config.BATCH_MAX_CLAIMS:
+            return jsonify({
+                'error': f'Too many claims (max {Config.BATCH_MAX_CLAIMS})'
+            }), 400
         
-        return jsonify(result), 200
+        return run_or_submit('batch', wants_async(data), factcheck_service.verify_batch, claims)
         
+    except HTTPException:
+        # 413 / 400 raised while reading the body keep their status
+        raise
     except Exception as e:
         return jsonify({
             'error': 'Internal server error',
@@ -90,6 +222,46 @@ def verify_url():
         }), 500
 
 
+@factcheck_bp.route('/verify/text/stream', methods=['GET', 'POST'])
+def verify_text_stream():
+    """
+    Verify text claim, streaming each stage as a Server-Sent Event
+    
+    Body: {"text": "Claim to verify"}   (or GET ?text=... for EventSource)
+    
+    Events: search, sources, credibility, verdict
+    """
+    text = string_field(request.get_json(silent=True) or request.args, 'text')
+    
+    if not text:
+        return jsonify({
+            'error': 'Missing required field: text',
+            'example': {'text': 'Your claim here'}
+        }), 400
+    
+    return sse_response(factcheck_service.iter_verify_text(text))
+
+
+@factcheck_bp.route('/verify/url/stream', methods=['GET', 'POST'])
+def verify_url_stream():
+    """
+    Verify article from URL, streaming each stage as a Server-Sent Event
+    
+    Body: {"url": "https://example.com/article"}   (or GET ?url=...)
+    
+    Events: credibility, article, search, verdict
+    """
+    url = string_field(request.get_json(silent=True) or request.args, 'url')
+    
+    if not url or not url.startswith(('http://', 'https://')):
+        return jsonify({
+            'error': 'Missing or invalid field: url',
+            'example': {'url': 'https://example.com/article'}
+        }), 400
+    
+    return sse_response(factcheck_service.iter_verify_url(url))
+
+
 @factcheck_bp.route('/health', methods=['GET'])
 def health_check():
     """Health check endpoint"""
@@ -104,6 +276,25 @@ def health_check():
     }), 200
 
 
+@factcheck_bp.route('/stats', methods=['GET'])
+def cache_stats():
+    """Cache hit/miss and connection reuse counters"""
+    
+    return jsonify({
+        'search_cache': factcheck_service.search_cache.stats(),
+        'domain_cache': factcheck_service.domain_cache.stats(),
+        'verdict_cache': factcheck_service.verdict_cache.stats(),
+        'knowledge_base': factcheck_service.knowledge_base.stats(),
+        'claimreview_index': get_claimreview_index().stats(),
+        'image_index': image_service.fingerprints.stats(),
+        'image_fetcher': image_fetcher.stats(),
+        'jobs': job_manager.stats(),
+        'article_store': factcheck_service.article_store.stats(),
+        'http': get_http_client().stats(),
+        'llm': get_llm_gateway().stats()
+    }), 200
+
+
 @factcheck_bp.route('/test', methods=['GET'])
 def test_endpoint():
     """Test endpoint with sample claim"""
@@ -131,12 +322,17 @@ image_bp = Blueprint('image', __name__)
 # Initialize service
 image_service = ImageVerificationService()
 
-# Configure upload folder
-UPLOAD_FOLDER = '/tmp/fakecheck_uploads'
-ALLOWED_EXTENSIONS = {'png', 'jpg', 'jpeg', 'gif', 'bmp', 'webp'}
+# Bounded downloader for /verify/image/url
+image_fetcher = ImageFetcher(
+    get_http_client(),
+    max_bytes=Config.MAX_IMAGE_UPLOAD_BYTES,
+    url_ttl=Config.IMAGE_URL_CACHE_TTL,
+    max_entries=Config.IMAGE_URL_CACHE_MAX_ENTRIES,
+    cache_bytes=Config.IMAGE_URL_CACHE_MAX_BYTES,
+    fetch_timeout=Config.IMAGE_FETCH_TIMEOUT
+)
 
-# Create upload folder if it doesn't exist
-os.makedirs(UPLOAD_FOLDER, exist_ok=True)
+ALLOWED_EXTENSIONS = {'png', 'jpg', 'jpeg', 'gif', 'bmp', 'webp'}
 
 def allowed_file(filename):
     """Check if file extension is allowed"""
@@ -151,6 +347,7 @@ def verify_image():
     
     Accepts:
     - multipart/form-data with 'image' field (file upload)
+    - optional 'async' form field or ?async=true to return a job id instead
     
     Returns:
     {
@@ -185,22 +382,26 @@ def verify_image():
                 'allowed_types': list(ALLOWED_EXTENSIONS)
             }), 400
         
-        # Save file temporarily
-        filename = secure_filename(file.filename)
-        filepath = os.path.join(UPLOAD_FOLDER, filename)
-        file.save(filepath)
+        # Read once into memory (never touches disk)
+        image_bytes = file.read(Config.MAX_IMAGE_UPLOAD_BYTES + 1)
         
-        # Verify image
-        result = image_service.verify_image(filepath)
+        if len(image_bytes) > Config.MAX_IMAGE_UPLOAD_BYTES:
+            return jsonify({
+                'error': 'Image too large',
+                'max_bytes': Config.MAX_IMAGE_UPLOAD_BYTES
+            }), 413
         
-        # Clean up - delete temporary file
         try:
-            os.remove(filepath)
-        except:
-            pass
+            image = ImagePayload(image_bytes)
+        except InvalidImage as e:
+            return jsonify({'error': str(e)}), 400
         
-        return jsonify(result), 200
+        # Verify image
+        return run_or_submit('image', wants_async(request.form), image_service.verify_image, image)
         
+    except HTTPException:
+        # 413 / 400 raised while reading the body keep their status
+        raise
     except Exception as e:
         return jsonify({
             'error': 'Internal server error',
@@ -215,7 +416,8 @@ def verify_image_url():
     
     Body:
     {
-        "image_url": "https://example.com/image.jpg"
+        "image_url": "https://example.com/image.jpg",
+        "async": false          (optional - return a job id instead)
     }
     """
     
@@ -233,31 +435,21 @@ def verify_image_url():
         if not image_url.startswith(('http://', 'https://')):
             return jsonify({'error': 'Invalid URL format'}), 400
         
-        # Download image
-        import requests
-        import tempfile
-        
-        response = requests.get(image_url, timeout=10)
-        
-        if response.status_code != 200:
-            return jsonify({'error': 'Failed to download image'}), 400
-        
-        # Save to temporary file
-        with tempfile.NamedTemporaryFile(delete=False, suffix='.jpg') as tmp_file:
-            tmp_file.write(response.content)
-            tmp_filepath = tmp_file.name
-        
-        # Verify image
-        result = image_service.verify_image(tmp_filepath)
-        
-        # Clean up
+        # Download image (streamed, capped, cached by content hash)
         try:
-            os.remove(tmp_filepath)
-        except:
-            pass
+            image = image_fetcher.fetch(image_url)
+        except ImageFetchError as e:
+            return jsonify({
+                'error': str(e),
+                'max_bytes': Config.MAX_IMAGE_UPLOAD_BYTES
+            }), e.status
         
-        return jsonify(result), 200
+        # Verify image
+        return run_or_submit('image', wants_async(data), image_service.verify_image, image)
         
+    except HTTPException:
+        # 413 / 400 raised while reading the body keep their status
+        raise
     except Exception as e:
         return jsonify({
             'error': 'Internal server error',
@@ -276,5 +468,31 @@ def test_image_endpoint():
             'verify_image_url': 'POST /verify/image/url (provide URL)'
         },
         'accepted_formats': list(ALLOWED_EXTENSIONS),
+        'max_upload_bytes': Config.MAX_IMAGE_UPLOAD_BYTES,
         'status': 'ready'
-    }), 200
\ No newline at end of file
+    }), 200
+
+
+jobs_bp = Blueprint('jobs', __name__)
+
+
+@jobs_bp.route('/jobs/<job_id>', methods=['GET'])
+def get_job(job_id):
+    """
+    Status of an async verification job
+    
+    Returns:
+    {
+        "job_id": "...",
+        "status": "queued/running/done/failed",
+        "result": {...}         (when done)
+        "error": "..."          (when failed)
+    }
+    """
+    
+    job = job_manager.get(job_id)
+    
+    if not job:
+        return jsonify({'error': 'Job not found or expired'}), 404
+    
+    return jsonify(job), 200
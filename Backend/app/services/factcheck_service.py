@@ -1,12 +1,31 @@
 # app/services/factcheck_service.py
 
-import google.generativeai as genai
-import requests
+import sys
+from pathlib import Path
 import json
-from bs4 import BeautifulSoup
 from urllib.parse import urlparse
-import re
+from concurrent.futures import ThreadPoolExecutor, TimeoutError, as_completed, wait
+from functools import partial
 import os
+import time
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from utils.config import Config
+from utils.article_extractor import extract_article
+from utils.article_store import ArticleStore
+from utils.cache import SQLiteTTLCache
+from utils.deadline import Deadline
+from utils.domain_registry import get_domain_registry
+from utils.evidence_packer import EvidencePacker, estimate_tokens, truncate_to_tokens
+from utils.http_client import get_http_client
+from utils.knowledge_base import ClaimKnowledgeBase
+from utils import llm_schemas
+from utils.llm_gateway import get_llm_gateway, response_usage
+from utils.search_cache import get_search_cache, search_cache_key
+from utils.text import differ_in_key_terms, key_terms, normalize_text
+from utils.verdict_cache import VerdictCache
 
 class FactCheckService:
     def __init__(self):
@@ -15,106 +34,409 @@ class FactCheckService:
         if not api_key:
             raise ValueError("GEMINI_API_KEY not found in environment variables")
         
-        genai.configure(api_key=api_key)
-        self.gemini = genai.GenerativeModel('gemini-flash-latest')
+        self.llm = get_llm_gateway()
         
         # Serper API for Google search
         self.serper_key = os.getenv('SERPER_API_KEY')
+        self.search_cache = get_search_cache()
+        self.http = get_http_client()
         
-        # Credible sources database (still used as reference)
-        self.credible_sources = {
-            'reuters.com': 95,
-            'apnews.com': 95,
-            'bbc.com': 93,
-            'cnn.com': 88,
-            'nytimes.com': 90,
-            'theguardian.com': 89,
-            'washingtonpost.com': 88,
-            'npr.org': 92,
-            'pbs.org': 92,
-            'forbes.com': 85,
-            'bloomberg.com': 90,
-            'wsj.com': 89,
-            'nature.com': 98,
-            'science.org': 98,
-            'who.int': 97,
-            'cdc.gov': 97,
-            'wikipedia.org': 80
-        }
+        # Known credible / unreliable sources (loaded from data files)
+        self.domain_registry = get_domain_registry()
         
-        self.unreliable_sources = {
-            'naturalnews.com': 10,
-            'infowars.com': 5,
-            'beforeitsnews.com': 15,
-            'worldnewsdailyreport.com': 5,
-            'nationalreport.net': 10
-        }
+        # Persistent cache of AI domain ratings
+        self.domain_cache = SQLiteTTLCache(
+            os.path.join(Config.CACHE_DIR, 'domains.sqlite3'),
+            table='domain_ratings',
+            max_entries=Config.DOMAIN_CACHE_MAX_ENTRIES,
+            ttl=Config.DOMAIN_CACHE_TTL
+        )
+        
+        # Extracted articles, revalidated with conditional GETs
+        self.article_store = ArticleStore(
+            os.path.join(Config.CACHE_DIR, 'articles.sqlite3'),
+            max_entries=Config.ARTICLE_STORE_MAX_ENTRIES,
+            max_disk_entries=Config.ARTICLE_STORE_MAX_DISK_ENTRIES,
+            fresh_seconds=Config.ARTICLE_FRESH_SECONDS,
+            ttl=Config.ARTICLE_STORE_TTL
+        )
+        
+        # Verdicts for recently checked claims, matched on near-duplicates
+        self.verdict_cache = VerdictCache(
+            max_entries=Config.VERDICT_CACHE_MAX_ENTRIES,
+            ttl=Config.VERDICT_CACHE_TTL,
+            threshold=Config.VERDICT_CACHE_SIMILARITY
+        )
+        
+        # Every verified claim, retrieved as prior evidence for related ones
+        self.knowledge_base = ClaimKnowledgeBase(
+            os.path.join(Config.CACHE_DIR, 'knowledge_base.sqlite3'),
+            max_entries=Config.CLAIM_KB_MAX_ENTRIES,
+            max_disk_entries=Config.CLAIM_KB_MAX_DISK_ENTRIES,
+            ttl=Config.CLAIM_KB_TTL,
+            min_coverage=Config.CLAIM_KB_MIN_COVERAGE
+        )
+        
+        # Ranks evidence and fits it into the prompt token budget
+        self.evidence_packer = EvidencePacker(
+            budget=Config.EVIDENCE_TOKEN_BUDGET,
+            max_item_tokens=Config.EVIDENCE_ITEM_MAX_TOKENS
+        )
+        # URL verdicts lead with the article itself; other coverage is a
+        # short list of headlines
+        self.url_evidence_packer = EvidencePacker(
+            budget=Config.URL_EVIDENCE_TOKEN_BUDGET,
+            max_item_tokens=Config.URL_EVIDENCE_ITEM_MAX_TOKENS
+        )
+        
+        # Bounded worker pools for the concurrent pipeline
+        self.concurrent = Config.CONCURRENT_PIPELINE
+        self._stage_pool = ThreadPoolExecutor(
+            max_workers=Config.PIPELINE_MAX_WORKERS,
+            thread_name_prefix='factcheck-stage'
+        )
+        self._scrape_pool = ThreadPoolExecutor(
+            max_workers=Config.SCRAPE_MAX_WORKERS,
+            thread_name_prefix='factcheck-scrape'
+        )
+        self._domain_pool = ThreadPoolExecutor(
+            max_workers=Config.DOMAIN_RATING_MAX_WORKERS,
+            thread_name_prefix='factcheck-domain'
+        )
     
     def verify_text(self, text):
         """Main verification method for text claims"""
+        return self._final_verdict(self.iter_verify_text(text))
+    
+    def verify_url(self, url):
+        """Verify article from URL"""
+        return self._final_verdict(self.iter_verify_url(url))
+    
+    def iter_verify_text(self, text, deadline=None):
+        """
+        Verify a text claim stage by stage
+        
+        Yields (event, data) pairs as each stage finishes: 'search',
+        'sources' and 'credibility' (in completion order), then 'verdict'.
+        Closing the generator early skips the remaining stages, including
+        the Gemini call. Stages share one Deadline (VERIFICATION_TIMEOUT by
+        default); optional ones that no longer fit are listed in the
+        verdict's skipped_stages.
+        """
+        deadline = deadline or Deadline(Config.VERIFICATION_TIMEOUT)
+        reserve = Config.VERDICT_TIME_RESERVE
+        pending = []
         try:
             print(f"🔍 Verifying claim: {text[:100]}...")
             
-            # Step 1: Search web for evidence
-            search_results = self._search_web(text)
+            # Reuse the verdict of a recent (possibly reworded) claim
+            cached = self.verdict_cache.get(text)
+            if cached:
+                verdict, age, similarity = cached
+                print(f"♻️ Verdict cache hit (similarity {similarity:.2f})")
+                yield 'verdict', dict(
+                    verdict,
+                    cached=True,
+                    cache_age_seconds=round(age),
+                    cache_similarity=round(similarity, 2)
+                )
+                return
             
-            # Step 2: Scrape top articles
-            scraped_content = self._scrape_articles(search_results)
+            # Answer from the knowledge base when the same claim was checked recently
+            answer, prior_verdicts = self._prior_verdicts(text)
+            if answer:
+                print(f"📚 Knowledge base match: {answer['matched_claim'][:80]}")
+                yield 'verdict', answer
+                return
             
-            # Step 3: Check source credibility (NOW WITH AI)
-            source_scores = self._analyze_source_credibility(search_results)
+            # Step 1: Search web for evidence
+            search_results = self._search_web(text, timeout=deadline.timeout(10, reserve))
+            yield 'search', {'count': len(search_results), 'results': search_results}
+            
+            if self.concurrent:
+                # Steps 2 + 3 run side by side once search results are in
+                pending = [
+                    self._stage_pool.submit(
+                        self._scrape_articles, search_results, deadline=deadline
+                    ),
+                    self._stage_pool.submit(
+                        self._analyze_source_credibility, search_results, deadline=deadline
+                    )
+                ]
+                stages = {pending[0]: 'sources', pending[1]: 'credibility'}
+                results = {}
+                
+                # Stages queued behind other requests on the shared pool
+                # must not hold this one past its deadline
+                stage_timeout = deadline.timeout(Config.VERIFICATION_TIMEOUT, reserve)
+                try:
+                    for future in as_completed(pending, timeout=stage_timeout):
+                        results[stages[future]] = future.result()
+                        yield self._stage_event(stages[future], results[stages[future]])
+                except TimeoutError:
+                    for future in pending:
+                        future.cancel()
+                    if 'sources' not in results:
+                        deadline.skip('scrape')
+                        results['sources'] = []
+                        yield self._stage_event('sources', results['sources'])
+                    if 'credibility' not in results:
+                        deadline.skip('ai_domain_rating')
+                        results['credibility'] = self._analyze_source_credibility(
+                            search_results, ratings_by_domain=self._rate_domains_offline(
+                                self._get_domain(r['link']) for r in search_results if r.get('link')
+                            )
+                        )
+                        yield self._stage_event('credibility', results['credibility'])
+                
+                scraped_content = results['sources']
+                source_scores = results['credibility']
+            else:
+                # Step 2: Scrape top articles
+                scraped_content = self._scrape_articles(search_results, deadline=deadline)
+                yield self._stage_event('sources', scraped_content)
+                
+                # Step 3: Check source credibility (NOW WITH AI)
+                source_scores = self._analyze_source_credibility(search_results, deadline=deadline)
+                yield self._stage_event('credibility', source_scores)
             
             # Step 4: Gemini analysis
-            verdict = self._gemini_verify(text, search_results, scraped_content, source_scores)
+            verdict = self._gemini_verify(
+                text, search_results, scraped_content, source_scores, prior_verdicts,
+                timeout=deadline.timeout(Config.LLM_TIMEOUT)
+            )
+            verdict['skipped_stages'] = deadline.skipped
+            
+            # Verdicts built on partial evidence are not reused
+            if not verdict['skipped_stages']:
+                self._remember_verdict(text, verdict, search_results)
             
-            return verdict
+            yield 'verdict', dict(verdict, cached=False)
             
         except Exception as e:
             print(f"❌ Error: {str(e)}")
-            return {
+            yield 'verdict', {
                 'verdict': 'ERROR',
                 'credibility_score': 0,
                 'confidence': 0,
                 'reasoning': f'Verification failed: {str(e)}',
                 'color': 'gray'
             }
+        finally:
+            # Abandoned stream: drop stage work that has not started yet
+            for future in pending:
+                future.cancel()
     
-    def verify_url(self, url):
-        """Verify article from URL"""
+    def iter_verify_url(self, url, deadline=None):
+        """
+        Verify an article URL stage by stage
+        
+        Yields 'credibility', 'article', 'search', then 'verdict'. AI domain
+        rating and the corroborating search are skipped when the Deadline
+        runs low.
+        """
+        deadline = deadline or Deadline(Config.VERIFICATION_TIMEOUT)
+        reserve = Config.VERDICT_TIME_RESERVE
         try:
             print(f"🔍 Verifying URL: {url}")
             
             # Step 1: Check domain credibility (NOW WITH AI)
-            domain_score = self._check_domain(url)
+            domain_score = self._check_domain(url, deadline)
+            yield 'credibility', domain_score
             
             # Step 2: Scrape article content
-            article_content = self._scrape_single_url(url)
+            article_content = self._scrape_single_url(url, timeout=deadline.timeout(10, reserve))
             
             if not article_content:
-                return {
+                yield 'verdict', {
                     'verdict': 'ERROR',
                     'credibility_score': 0,
                     'reasoning': 'Could not access article content',
                     'color': 'gray'
                 }
+                return
+            
+            yield 'article', article_content
             
             # Step 3: Search for same topic from other sources
-            search_results = self._search_web(article_content['title'])
+            search_results = []
+            if deadline.allows('search', reserve):
+                search_results = self._search_web(
+                    article_content['title'], timeout=deadline.timeout(10, reserve)
+                )
+            yield 'search', {'count': len(search_results), 'results': search_results}
             
             # Step 4: Gemini analysis
-            verdict = self._gemini_verify_url(url, article_content, search_results, domain_score)
+            verdict = self._gemini_verify_url(
+                url, article_content, search_results, domain_score,
+                timeout=deadline.timeout(Config.LLM_TIMEOUT)
+            )
             
-            return verdict
+            yield 'verdict', dict(verdict, skipped_stages=deadline.skipped)
             
         except Exception as e:
-            return {
+            yield 'verdict', {
                 'verdict': 'ERROR',
                 'credibility_score': 0,
                 'reasoning': f'URL verification failed: {str(e)}',
                 'color': 'gray'
             }
     
-    def _search_web(self, query):
+    def verify_batch(self, claims):
+        """
+        Verify many claims at once, sharing work across the batch
+        
+        Identical claims (after normalization) are verified once. Searches
+        run in parallel, every distinct credible URL is scraped once and
+        every distinct domain is rated once (batched AI) for the whole
+        batch; Gemini verdicts then run with bounded parallelism.
+        Returns results in input order.
+        """
+        print(f"🔍 Verifying batch of {len(claims)} claims...")
+        
+        # Deduplicate: normalized claim -> first original wording
+        unique = {}
+        for claim in claims:
+            unique.setdefault(normalize_text(claim), claim)
+        
+        verdicts = {}
+        prior_verdicts = {}
+        to_verify = []
+        for key, claim in unique.items():
+            cached = self.verdict_cache.get(claim)
+            if cached:
+                verdict, age, similarity = cached
+                verdicts[key] = dict(
+                    verdict,
+                    cached=True,
+                    cache_age_seconds=round(age),
+                    cache_similarity=round(similarity, 2)
+                )
+                continue
+            
+            answer, prior_verdicts[key] = self._prior_verdicts(claim)
+            if answer:
+                verdicts[key] = answer
+            else:
+                to_verify.append(key)
+        
+        with ThreadPoolExecutor(max_workers=Config.BATCH_MAX_WORKERS,
+                                thread_name_prefix='factcheck-batch') as pool:
+            # Step 1: Search every claim
+            searches = dict(zip(
+                to_verify,
+                pool.map(self._search_web, [unique[key] for key in to_verify])
+            ))
+            
+            # Steps 2 + 3: scrape each URL and rate each domain once per batch
+            links = list(dict.fromkeys(
+                link for results in searches.values() for link in self._scrape_targets(results)
+            ))
+            domains = list(dict.fromkeys(
+                self._get_domain(r['link'])
+                for results in searches.values() for r in results if r.get('link')
+            ))
+            
+            scrape_future = self._stage_pool.submit(
+                lambda: dict(zip(links, self._scrape_pool.map(self._scrape_single_url, links)))
+            )
+            ratings_by_domain = self._rate_domains(domains)
+            scraped_by_url = scrape_future.result()
+            
+            print(f"✅ Batch shares {len(links)} scraped URLs and {len(domains)} rated domains")
+            
+            # Step 4: Gemini analysis per claim
+            def verify_one(key):
+                search_results = searches[key]
+                try:
+                    scraped_content = self._scrape_articles(search_results, scraped_by_url)
+                    source_scores = self._analyze_source_credibility(search_results, ratings_by_domain)
+                    verdict = self._gemini_verify(
+                        unique[key], search_results, scraped_content, source_scores,
+                        prior_verdicts[key]
+                    )
+                except Exception as e:
+                    print(f"❌ Error: {str(e)}")
+                    verdict = {
+                        'verdict': 'ERROR',
+                        'credibility_score': 0,
+                        'confidence': 0,
+                        'reasoning': f'Verification failed: {str(e)}',
+                        'color': 'gray'
+                    }
+                self._remember_verdict(unique[key], verdict, search_results)
+                return dict(verdict, cached=False)
+            
+            verdicts.update(zip(to_verify, pool.map(verify_one, to_verify)))
+        
+        return {
+            'results': [
+                dict(verdicts[normalize_text(claim)], claim=claim) for claim in claims
+            ],
+            'count': len(claims),
+            'unique_claims': len(unique),
+            'verified_claims': len(to_verify)
+        }
+    
+    def _prior_verdicts(self, claim):
+        """
+        (answer, related) from the knowledge base
+        
+        answer is a ready verdict when a near-identical claim was verified
+        within CLAIM_KB_ANSWER_MAX_AGE, otherwise None; related holds the
+        top-k prior records to include in the Gemini prompt. Claims that
+        differ in a negation, number or name are never answered directly.
+        """
+        related = self.knowledge_base.search(claim, k=Config.CLAIM_KB_TOP_K)
+        words, terms = normalize_text(claim).split(), key_terms(claim)
+        for record in related:
+            age = time.time() - record['verified_at']
+            if record['similarity'] >= Config.CLAIM_KB_ANSWER_SIMILARITY \
+                    and age <= Config.CLAIM_KB_ANSWER_MAX_AGE \
+                    and not differ_in_key_terms(
+                        words, terms,
+                        normalize_text(record['claim']).split(), key_terms(record['claim'])
+                    ):
+                return dict(
+                    record['verdict'],
+                    cached=True,
+                    cache_source='knowledge_base',
+                    cache_age_seconds=round(age),
+                    cache_similarity=round(record['similarity'], 2),
+                    matched_claim=record['claim']
+                ), related
+        return None, related
+    
+    def _remember_verdict(self, claim, verdict, search_results):
+        """
+        Keep a successful verdict in the verdict cache and knowledge base
+        
+        Verdicts reached without any search results are not kept: an empty
+        result list usually means the search failed, not that nobody
+        reported the claim.
+        """
+        if verdict['verdict'] == 'ERROR' or not search_results:
+            return
+        self.verdict_cache.set(claim, verdict)
+        self.knowledge_base.add(
+            claim, verdict, [r['link'] for r in search_results[:5] if r.get('link')]
+        )
+    
+    def _stage_event(self, stage, data):
+        """(event, data) pair for a finished evidence stage"""
+        if stage == 'sources':
+            return 'sources', {'count': len(data), 'articles': data}
+        return stage, data
+    
+    def _final_verdict(self, events):
+        """Drain a stage generator and return its 'verdict' payload"""
+        verdict = None
+        for event, data in events:
+            if event == 'verdict':
+                verdict = data
+        return verdict
+    
+    def _search_web(self, query, timeout=10):
         """Search using Serper API (Google Search)"""
         if not self.serper_key:
             print("⚠️ No Serper API key - using fallback")
@@ -133,8 +455,14 @@ class FactCheckService:
         }
         
         try:
-            response = requests.post(url, headers=headers, data=payload, timeout=10)
-            data = response.json()
+            cache_key = search_cache_key(query, num=10)
+            data = self.search_cache.get(cache_key)
+            
+            if data is None:
+                response = self.http.post(url, headers=headers, data=payload, timeout=timeout, budget=timeout)
+                data = response.json()
+                if response.status_code == 200:
+                    self.search_cache.set(cache_key, data)
             
             results = []
             
@@ -170,100 +498,147 @@ class FactCheckService:
             print(f"❌ Search error: {e}")
             return []
     
-    def _scrape_articles(self, search_results):
-        """Scrape content from top credible sources"""
+    def _scrape_articles(self, search_results, scraped_by_url=None, deadline=None):
+        """Scrape content from top credible sources (optional: cut short by the deadline)"""
         scraped = []
         
-        # Only scrape from credible sources
-        credible_results = [
-            r for r in search_results 
-            if any(source in r.get('link', '') for source in self.credible_sources.keys())
-        ][:3]  # Top 3 credible sources
+        links = self._scrape_targets(search_results)
+        reserve = Config.VERDICT_TIME_RESERVE
+        timeout = deadline.timeout(10, reserve) if deadline else 10
         
-        for result in credible_results:
-            content = self._scrape_single_url(result['link'])
+        if scraped_by_url is not None:
+            # Already scraped (shared across a batch)
+            contents = [scraped_by_url.get(link) for link in links]
+        elif links and deadline and not deadline.allows('scrape', reserve):
+            contents = []
+        elif self.concurrent:
+            futures = [
+                self._scrape_pool.submit(self._scrape_single_url, link, timeout)
+                for link in links
+            ]
+            # Keep what finished in time; slow pages are dropped
+            done, not_done = wait(
+                futures, timeout=max(0, deadline.remaining() - reserve) if deadline else None
+            )
+            for future in not_done:
+                future.cancel()
+            if not_done:
+                deadline.skip('scrape_partial')
+            contents = [future.result() for future in futures if future in done]
+        else:
+            contents = []
+            for link in links:
+                if deadline and not deadline.allows('scrape_partial', reserve):
+                    break
+                contents.append(self._scrape_single_url(link, timeout))
+        
+        for content in contents:
             if content:
                 scraped.append(content)
         
         print(f"✅ Scraped {len(scraped)} articles")
         return scraped
     
-    def _scrape_single_url(self, url):
-        """Scrape content from single URL"""
+    def _scrape_targets(self, search_results):
+        """Links worth scraping: the top 3 from credible sources"""
+        credible_results = [
+            r for r in search_results 
+            if r.get('link') and self.domain_registry.is_credible(r['link'])
+        ][:3]  # Top 3 credible sources
+        
+        return [result['link'] for result in credible_results]
+    
+    def _scrape_single_url(self, url, timeout=10):
+        """Scrape content from single URL (streamed, capped at SCRAPE_MAX_BYTES)"""
         try:
+            cached, fresh = self.article_store.lookup(url)
+            if fresh:
+                return dict(cached['record'], url=url)
+            
             headers = {
                 'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
             }
+            headers.update(self.article_store.conditional_headers(cached))
             
-            response = requests.get(url, headers=headers, timeout=10)
-            soup = BeautifulSoup(response.content, 'html.parser')
-            
-            # Remove script and style elements
-            for script in soup(["script", "style"]):
-                script.decompose()
-            
-            # Get title
-            title = soup.find('title')
-            title_text = title.get_text().strip() if title else ''
+            response = self.http.get(url, headers=headers, timeout=timeout, budget=timeout, stream=True)
+            try:
+                if cached and response.status_code == 304:
+                    self.article_store.revalidated(url, cached)
+                    return dict(cached['record'], url=url)
+                
+                # Only title / article / p are parsed; reading stops early
+                # once enough article text has been extracted
+                title_text, text_content, _ = extract_article(
+                    response,
+                    max_bytes=Config.SCRAPE_MAX_BYTES,
+                    max_paragraphs=10,
+                    max_chars=2000
+                )
+            finally:
+                response.close()
             
-            # Get main content
-            # Try common article tags
-            article = soup.find('article')
-            if not article:
-                article = soup.find('div', class_=re.compile('article|content|post'))
-            
-            if article:
-                paragraphs = article.find_all('p')
-            else:
-                paragraphs = soup.find_all('p')
-            
-            # Extract text from paragraphs
-            text_content = ' '.join([p.get_text().strip() for p in paragraphs[:10]])
-            
-            # Clean text
-            text_content = re.sub(r'\s+', ' ', text_content).strip()
-            
-            return {
+            record = {
                 'url': url,
                 'title': title_text,
-                'content': text_content[:2000],  # Limit to 2000 chars
+                'content': text_content,  # Limited to 2000 chars
                 'source': urlparse(url).netloc.replace('www.', '')
             }
             
+            if response.status_code == 200:
+                self.article_store.store(url, record, response.headers)
+            
+            return record
+            
         except Exception as e:
             print(f"❌ Scraping error for {url}: {e}")
             return None
     
-    def _check_domain(self, url):
+    def _check_domain(self, url, deadline=None):
         """Check domain credibility score using AI"""
-        domain = urlparse(url).netloc.replace('www.', '')
+        domain = self._get_domain(url)
+        return self._rate_domains([domain], deadline)[domain]
+    
+    def _get_domain(self, url):
+        """Extract bare domain from URL"""
+        return urlparse(url).netloc.replace('www.', '')
+    
+    def _rate_domain(self, domain, timeout=None):
+        """Rate a bare domain: known lists, then cache, then AI"""
+        known = self._lookup_domain(domain)
+        if known:
+            return known
         
+        # If unknown, ask Gemini to rate it
+        print(f"🤖 Using AI to assess domain: {domain}")
+        rating = self._ai_rate_source(domain, timeout)
+        
+        # Only successful assessments are cached; failures retry next time
+        if rating.get('ai_assessed'):
+            self.domain_cache.set(domain, rating)
+        
+        return rating
+    
+    def _lookup_domain(self, domain):
+        """Rate a domain from known lists or cache, without calling AI"""
         # First check if in known lists (for speed)
-        for source, score in self.credible_sources.items():
-            if source in domain:
-                return {
-                    'domain': domain, 
-                    'score': score, 
-                    'category': 'credible',
-                    'ai_assessed': False,
-                    'reasoning': 'Known credible source'
-                }
+        known = self.domain_registry.lookup(domain)
+        if known:
+            return {
+                'domain': domain, 
+                'score': known['score'], 
+                'category': known['category'],
+                'ai_assessed': False,
+                'reasoning': f"Known {known['category']} source"
+            }
         
-        for source, score in self.unreliable_sources.items():
-            if source in domain:
-                return {
-                    'domain': domain, 
-                    'score': score, 
-                    'category': 'unreliable',
-                    'ai_assessed': False,
-                    'reasoning': 'Known unreliable source'
-                }
+        # Previously rated by AI?
+        cached = self.domain_cache.get(domain)
+        if cached:
+            return dict(cached, cached=True)
         
-        # If unknown, ask Gemini to rate it
-        print(f"🤖 Using AI to assess domain: {domain}")
-        return self._ai_rate_source(domain)
+        return None
     
-    def _ai_rate_source(self, domain):
+    def _ai_rate_source(self, domain, timeout=None):
         """Use Gemini AI to rate source credibility"""
         try:
             prompt = f"""You are a media credibility expert. Rate this news source: {domain}
@@ -291,53 +666,216 @@ Return ONLY valid JSON (no markdown):
     "strengths": ["list any positive factors"]
 }}"""
 
-            response = self.gemini.generate_content(
+            analysis, _ = self.llm.generate_json(
+                '_ai_rate_source',
                 prompt,
-                generation_config={'temperature': 0.1}
+                llm_schemas.DOMAIN_RATING,
+                generation_config={'temperature': 0.1},
+                timeout=timeout
             )
             
-            result_text = response.text.strip()
-            result_text = result_text.replace('```json', '').replace('```', '').strip()
-            
-            analysis = json.loads(result_text)
-            
-            return {
-                'domain': domain,
-                'score': analysis['credibility_score'],
-                'category': analysis['category'],
-                'ai_assessed': True,
-                'reasoning': analysis['reasoning'],
-                'red_flags': analysis.get('red_flags', []),
-                'strengths': analysis.get('strengths', [])
-            }
+            return self._build_ai_rating(domain, analysis)
             
         except Exception as e:
             print(f"❌ AI rating error: {e}")
-            # Fallback to neutral score
-            return {
-                'domain': domain,
-                'score': 50,
-                'category': 'unknown',
-                'ai_assessed': False,
-                'reasoning': f'Could not assess: {str(e)}'
-            }
+            return self._unrated_domain(domain, f'Could not assess: {str(e)}')
+    
+    def _unrated_domain(self, domain, reasoning):
+        """Neutral score for a domain that could not be rated"""
+        return {
+            'domain': domain,
+            'score': 50,
+            'category': 'unknown',
+            'ai_assessed': False,
+            'reasoning': reasoning
+        }
+    
+    def _build_ai_rating(self, domain, analysis):
+        """Convert Gemini's rating JSON into a domain info dict"""
+        return {
+            'domain': domain,
+            'score': analysis['credibility_score'],
+            'category': analysis['category'],
+            'ai_assessed': True,
+            'reasoning': analysis['reasoning'],
+            'red_flags': analysis.get('red_flags', []),
+            'strengths': analysis.get('strengths', [])
+        }
     
-    def _analyze_source_credibility(self, search_results):
+    def _ai_rate_sources_batch(self, domains, timeout=None):
+        """
+        Rate several domains with a single Gemini call
+        
+        Returns {domain: domain_info} for every domain the model rated, or
+        None if the call itself failed. Domains missing from a successful
+        response are left out so callers can fall back to _ai_rate_source.
+        """
+        domain_list = "\n".join(f"- {domain}" for domain in domains)
+        
+        prompt = f"""You are a media credibility expert. Rate each of these news sources:
+{domain_list}
+
+Analyze each based on:
+1. REPUTATION: Is this a known, established news organization?
+2. JOURNALISTIC STANDARDS: Do they follow ethical journalism practices?
+3. FACT-CHECKING: Do they have editorial oversight and corrections policy?
+4. BIAS: Any extreme political bias or agenda?
+5. RELIABILITY: Track record of accuracy vs misinformation?
+
+Examples for reference:
+- Reuters, BBC, AP News = 90-95 (highly credible, international standards)
+- CNN, The Hindu, AajTak = 85-90 (credible mainstream with editorial standards)
+- Local/regional news = 70-80 (credible but less rigorous)
+- Blogs, opinion sites = 40-60 (depends on author)
+- Conspiracy sites, fake news = 5-20 (unreliable)
+
+Return ONLY valid JSON (no markdown), one entry per source, using the domain exactly as listed:
+{{
+    "ratings": [
+        {{
+            "domain": "example.com",
+            "credibility_score": 0-100,
+            "category": "credible" | "moderate" | "unreliable" | "unknown",
+            "reasoning": "1-2 sentence explanation of the rating",
+            "red_flags": ["list any concerns"],
+            "strengths": ["list any positive factors"]
+        }}
+    ]
+}}"""
+        
+        try:
+            analysis, _ = self.llm.generate_json(
+                '_ai_rate_sources_batch',
+                prompt,
+                llm_schemas.DOMAIN_RATINGS_BATCH,
+                generation_config={'temperature': 0.1},
+                timeout=timeout
+            )
+            
+        except Exception as e:
+            print(f"❌ Batch AI rating error: {e}")
+            return None
+        
+        wanted = {domain.lower(): domain for domain in domains}
+        ratings = {}
+        
+        for item in analysis.get('ratings', []):
+            try:
+                domain = wanted.get(str(item.get('domain', '')).lower().replace('www.', ''))
+                if domain and domain not in ratings:
+                    ratings[domain] = self._build_ai_rating(domain, item)
+            except (KeyError, AttributeError) as e:
+                print(f"⚠️ Skipping malformed batch rating: {e}")
+        
+        return ratings
+    
+    def _rate_domains(self, domains, deadline=None):
+        """
+        Rate distinct domains, batching every AI lookup into one call per chunk
+        
+        AI rating is optional: once the deadline runs low, unknown domains
+        get a neutral score instead.
+        """
+        ratings = {}
+        unknown = []
+        reserve = Config.VERDICT_TIME_RESERVE
+        
+        for domain in domains:
+            known = self._lookup_domain(domain)
+            if known:
+                ratings[domain] = known
+            else:
+                unknown.append(domain)
+        
+        if unknown and deadline and not deadline.allows('ai_domain_rating', reserve):
+            ratings.update(self._rate_domains_offline(unknown))
+            return ratings
+        
+        timeout = deadline.timeout(Config.LLM_TIMEOUT, reserve) if deadline else None
+        # Bounds the wait for pool workers, which may be busy with other requests
+        wait_timeout = deadline.timeout(Config.VERIFICATION_TIMEOUT, reserve) if deadline else None
+        
+        if len(unknown) > 1:
+            print(f"🤖 Using AI to assess {len(unknown)} domains in batch")
+            size = Config.DOMAIN_RATING_BATCH_SIZE
+            chunks = [unknown[i:i + size] for i in range(0, len(unknown), size)]
+            rate_batch = partial(self._ai_rate_sources_batch, timeout=timeout)
+            
+            if self.concurrent:
+                batches = self._domain_pool.map(rate_batch, chunks, timeout=wait_timeout)
+            else:
+                batches = map(rate_batch, chunks)
+            
+            try:
+                for chunk, batch in zip(chunks, batches):
+                    # A failed call (quota, overload) is not retried domain by
+                    # domain: that fan-out would only burn more quota
+                    if batch is None:
+                        for domain in chunk:
+                            ratings[domain] = self._unrated_domain(domain, 'Could not assess: batch rating failed')
+                        continue
+                    for domain, rating in batch.items():
+                        self.domain_cache.set(domain, rating)
+                        ratings[domain] = rating
+            except TimeoutError:
+                deadline.skip('ai_domain_rating')
+                ratings.update(self._rate_domains_offline(d for d in unknown if d not in ratings))
+                return ratings
+        
+        # Domains a successful batch skipped go through the single-domain path
+        missing = [domain for domain in unknown if domain not in ratings]
+        
+        if missing and deadline and not deadline.allows('ai_domain_rating', reserve):
+            ratings.update(self._rate_domains_offline(missing))
+            return ratings
+        
+        if len(unknown) > 1 and deadline:
+            timeout = deadline.timeout(Config.LLM_TIMEOUT, reserve)
+            wait_timeout = deadline.timeout(Config.VERIFICATION_TIMEOUT, reserve)
+        rate_one = partial(self._rate_domain, timeout=timeout)
+        if self.concurrent:
+            fallback = self._domain_pool.map(rate_one, missing, timeout=wait_timeout)
+        else:
+            fallback = map(rate_one, missing)
+        
+        try:
+            for domain, rating in zip(missing, fallback):
+                ratings[domain] = rating
+        except TimeoutError:
+            deadline.skip('ai_domain_rating')
+            ratings.update(self._rate_domains_offline(d for d in missing if d not in ratings))
+        
+        return ratings
+    
+    def _rate_domains_offline(self, domains):
+        """Known-list or cached ratings only; neutral score for the rest"""
+        return {
+            domain: self._lookup_domain(domain)
+            or self._unrated_domain(domain, 'Not assessed: time budget exhausted')
+            for domain in domains
+        }
+    
+    def _analyze_source_credibility(self, search_results, ratings_by_domain=None, deadline=None):
         """Analyze credibility of all sources found (NOW WITH AI)"""
         source_analysis = []
         
-        for result in search_results:
-            link = result.get('link', '')
-            if link:
-                domain_info = self._check_domain(link)
-                source_analysis.append({
-                    'source': domain_info['domain'],
-                    'score': domain_info['score'],
-                    'category': domain_info['category'],
-                    'ai_assessed': domain_info.get('ai_assessed', False),
-                    'reasoning': domain_info.get('reasoning', ''),
-                    'title': result.get('title', '')
-                })
+        results = [r for r in search_results if r.get('link', '')]
+        domains = [self._get_domain(r['link']) for r in results]
+        
+        # Rate each distinct domain once per request
+        if ratings_by_domain is None:
+            ratings_by_domain = self._rate_domains(list(dict.fromkeys(domains)), deadline)
+        
+        for result, domain in zip(results, domains):
+            domain_info = ratings_by_domain[domain]
+            source_analysis.append({
+                'source': domain_info['domain'],
+                'score': domain_info['score'],
+                'category': domain_info['category'],
+                'ai_assessed': domain_info.get('ai_assessed', False),
+                'reasoning': domain_info.get('reasoning', ''),
+                'title': result.get('title', '')
+            })
         
         # Calculate average credibility
         if source_analysis:
@@ -353,20 +891,49 @@ Return ONLY valid JSON (no markdown):
             'ai_assessed_count': len([s for s in source_analysis if s.get('ai_assessed', False)])
         }
     
-    def _gemini_verify(self, claim, search_results, scraped_content, source_scores):
+    def _gemini_verify(self, claim, search_results, scraped_content, source_scores,
+                       prior_verdicts=(), timeout=None):
         """Use Gemini to analyze all evidence and determine verdict"""
         
-        # Prepare evidence summary
+        # Rank articles and snippets by relevance and source credibility,
+        # then fill the evidence token budget best first
+        scores = {s['source']: s['score'] for s in source_scores.get('sources', [])}
+        evidence, token_usage = self.evidence_packer.pack(claim, [
+            {
+                'kind': 'article',
+                'source': s['source'],
+                'text': f"{s['title']}. {s['content']}",
+                'credibility': scores.get(s['source'])
+            }
+            for s in scraped_content
+        ] + [
+            {
+                'kind': 'search',
+                'source': r['source'],
+                'text': f"{r['title']}: {r['snippet']}",
+                'credibility': scores.get(r['source'])
+            }
+            for r in search_results
+        ])
+        
         search_summary = "\n".join([
-            f"- [{r['source']}] {r['title']}: {r['snippet'][:150]}"
-            for r in search_results[:5]
+            f"- [{e['source']}] {e['text']}" for e in evidence if e['kind'] == 'search'
         ])
         
         scraped_summary = "\n\n".join([
-            f"Source: {s['source']}\nTitle: {s['title']}\nContent: {s['content'][:500]}..."
-            for s in scraped_content
+            f"Source: {e['source']}\n{e['text']}" for e in evidence if e['kind'] == 'article'
         ])
         
+        prior_summary = ""
+        if prior_verdicts:
+            prior_summary = "\nPREVIOUSLY VERIFIED RELATED CLAIMS (earlier verdicts; current evidence takes precedence):\n" + "\n".join([
+                f"- \"{p['claim'][:200]}\" -> {p['verdict']['verdict']} "
+                f"(score {p['verdict']['credibility_score']}/100, checked "
+                f"{time.strftime('%Y-%m-%d', time.gmtime(p['verified_at']))}): "
+                f"{p['verdict'].get('reasoning', '')[:200]}"
+                for p in prior_verdicts
+            ]) + "\n"
+        
         prompt = f"""You are an expert fact-checker. Analyze this claim for truthfulness.
 
 CLAIM TO VERIFY:
@@ -383,7 +950,7 @@ SOURCE CREDIBILITY ANALYSIS:
 - Credible sources found: {source_scores['credible_count']}
 - Unreliable sources found: {source_scores['unreliable_count']}
 - AI-assessed sources: {source_scores.get('ai_assessed_count', 0)}
-
+{prior_summary}
 VERIFICATION CRITERIA:
 1. FACTUAL ACCURACY: Are the claims supported by evidence from credible sources?
 2. SOURCE RELIABILITY: Are credible news agencies (Reuters, BBC, AP) reporting this?
@@ -411,20 +978,17 @@ Return ONLY valid JSON (no markdown):
 }}"""
 
         try:
-            response = self.gemini.generate_content(
+            analysis, response = self.llm.generate_json(
+                '_gemini_verify',
                 prompt,
+                llm_schemas.CLAIM_VERDICT,
                 generation_config={
                     'temperature': 0.1,
                     'max_output_tokens': 2048
-                }
+                },
+                timeout=timeout
             )
             
-            # Parse response
-            result_text = response.text.strip()
-            result_text = result_text.replace('```json', '').replace('```', '').strip()
-            
-            analysis = json.loads(result_text)
-            
             # Determine color
             score = analysis['credibility_score']
             if score >= 75:
@@ -449,7 +1013,12 @@ Return ONLY valid JSON (no markdown):
                 'recommendation': analysis.get('recommendation', ''),
                 'source_analysis': source_scores,
                 'search_results_count': len(search_results),
-                'articles_analyzed': len(scraped_content)
+                'articles_analyzed': len(scraped_content),
+                'token_usage': dict(
+                    token_usage,
+                    prompt_tokens_estimate=estimate_tokens(prompt),
+                    **response_usage(response)
+                )
             }
             
         except Exception as e:
@@ -462,12 +1031,24 @@ Return ONLY valid JSON (no markdown):
                 'color': 'gray'
             }
     
-    def _gemini_verify_url(self, url, article_content, search_results, domain_score):
+    def _gemini_verify_url(self, url, article_content, search_results, domain_score, timeout=None):
         """Verify article from URL"""
         
+        article_text = truncate_to_tokens(article_content['content'], Config.ARTICLE_TOKEN_BUDGET)
+        
+        # Corroborating coverage, ranked and packed into the URL evidence budget
+        evidence, token_usage = self.url_evidence_packer.pack(article_content['title'], [
+            {
+                'source': r['source'],
+                'text': f"{r['title']}: {r['snippet']}",
+                'credibility': (self.domain_registry.lookup(r['link']) or {}).get('score')
+            }
+            for r in search_results if r.get('link')
+        ])
+        token_usage['article_tokens'] = estimate_tokens(article_text)
+        
         search_summary = "\n".join([
-            f"- [{r['source']}] {r['title']}"
-            for r in search_results[:5]
+            f"- [{e['source']}] {e['text']}" for e in evidence
         ])
         
         # Include AI assessment info if available
@@ -488,7 +1069,7 @@ DOMAIN CREDIBILITY: {domain_score['score']}/100 ({domain_score['category']}){ai_
 ARTICLE TITLE: {article_content['title']}
 
 ARTICLE CONTENT:
-{article_content['content'][:1500]}
+{article_text}
 
 OTHER SOURCES COVERING SAME TOPIC:
 {search_summary}
@@ -512,16 +1093,14 @@ Return ONLY valid JSON:
 }}"""
 
         try:
-            response = self.gemini.generate_content(
+            analysis, response = self.llm.generate_json(
+                '_gemini_verify_url',
                 prompt,
-                generation_config={'temperature': 0.1}
+                llm_schemas.URL_VERDICT,
+                generation_config={'temperature': 0.1},
+                timeout=timeout
             )
             
-            result_text = response.text.strip()
-            result_text = result_text.replace('```json', '').replace('```', '').strip()
-            
-            analysis = json.loads(result_text)
-            
             score = analysis['credibility_score']
             if score >= 75:
                 color = 'green'
@@ -542,7 +1121,12 @@ Return ONLY valid JSON:
                 'content_quality': analysis.get('content_quality', ''),
                 'corroboration': analysis.get('corroboration', ''),
                 'red_flags': analysis.get('red_flags', []),
-                'domain_info': domain_score
+                'domain_info': domain_score,
+                'token_usage': dict(
+                    token_usage,
+                    prompt_tokens_estimate=estimate_tokens(prompt),
+                    **response_usage(response)
+                )
             }
             
         except Exception as e:
@@ -1,28 +1,67 @@
 # app/services/image_verification_service.py
 
-import google.generativeai as genai
-from PIL import Image
 from PIL.ExifTags import TAGS
-import requests
 import json
 import os
 import base64
+import sys
+import time
+from pathlib import Path
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+from functools import partial
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from utils.config import Config
+from utils.deadline import Deadline
+from utils.domain_registry import get_domain_registry
+from utils.image_index import ImageFingerprintIndex
+from utils.image_payload import ImagePayload
+from utils.http_client import get_http_client
+from utils import llm_schemas
+from utils.llm_gateway import get_llm_gateway
+from utils.text import differ_in_key_terms, key_terms, tokenize
 
 class ImageVerificationService:
     
     def __init__(self):
-        # Initialize Gemini
-        genai.configure(api_key=os.getenv('GEMINI_API_KEY'))
-        self.gemini = genai.GenerativeModel('gemini-flash-latest')
+        # Gemini, via the shared rate-limited gateway
+        self.llm = get_llm_gateway()
         
         # Serper API key
         self.serper_key = os.getenv('SERPER_API_KEY')
+        self.http = get_http_client()
+        
+        # Known credible / unreliable sources
+        self.domain_registry = get_domain_registry()
+        
+        # Verdicts of previously seen (or near-duplicate) images
+        self.fingerprints = ImageFingerprintIndex(
+            os.path.join(Config.CACHE_DIR, 'images.sqlite3'),
+            max_entries=Config.IMAGE_INDEX_MAX_ENTRIES,
+            ttl=Config.IMAGE_INDEX_TTL,
+            radius=Config.IMAGE_HASH_RADIUS
+        )
+        
+        # Analyzers run side by side on a bounded pool
+        self._analyzer_pool = ThreadPoolExecutor(
+            max_workers=Config.IMAGE_ANALYZER_MAX_WORKERS,
+            thread_name_prefix='image-analyzer'
+        )
     
-    def verify_image(self, image_path):
+    def verify_image(self, image, deadline=None):
         """
         Complete image verification pipeline
         
+        `image` is an ImagePayload or raw image bytes; it is decoded once
+        and shared by every analyzer, with no filesystem I/O. Analyzer
+        timeouts are capped by the Deadline (VERIFICATION_TIMEOUT by
+        default); reverse search is skipped when the budget is too low.
+        A near-duplicate's stored verdict is reused only when this image's
+        extracted text matches it (IMAGE_TEXT_SIMILARITY).
+        
         Returns:
         {
             'verdict': 'LIKELY TRUE/FALSE/UNCERTAIN',
@@ -37,30 +76,86 @@ class ImageVerificationService:
         }
         """
         
+        deadline = deadline or Deadline(Config.VERIFICATION_TIMEOUT)
         try:
             print("🔍 Starting image verification...")
             
-            # Step 1: Gemini Vision - OCR + AI Analysis
-            print("📝 Extracting text and analyzing with Gemini...")
-            gemini_result = self._analyze_with_gemini(image_path)
+            if not isinstance(image, ImagePayload):
+                image = ImagePayload(image)
             
-            # Step 2: Metadata Analysis
-            print("🔍 Checking image metadata...")
-            metadata = self._analyze_metadata(image_path)
+            # Same or near-identical image verified recently?
+            cached = self.fingerprints.lookup(image)
+            gemini_result = None
+            if cached:
+                verdict, match = cached
+                if match['match'] != 'exact':
+                    # A reused template (meme, screenshot frame) can carry a
+                    # different caption: read this image's text before reusing
+                    gemini_result = self._analyze_with_gemini(
+                        image, timeout=deadline.timeout(Config.IMAGE_GEMINI_TIMEOUT)
+                    )
+                    if gemini_result.get('failed') or not self._same_text(
+                        gemini_result.get('extracted_text'), verdict.get('extracted_text')
+                    ):
+                        print("🔁 Near-duplicate image with different text - verifying afresh")
+                        cached = None
+            if cached:
+                print(f"♻️ Image index hit ({match['match']}, distance {match['hash_distance']})")
+                return dict(
+                    verdict,
+                    cached=True,
+                    cache_match=match['match'],
+                    cache_hash_distance=match['hash_distance'],
+                    cache_age_seconds=match['age_seconds']
+                )
             
-            # Step 3: Reverse Image Search (Serper)
-            print("🌐 Performing reverse image search...")
-            reverse_result = self._reverse_search_serper(image_path)
+            # Steps 1-3 run concurrently: Gemini Vision (OCR + AI analysis),
+            # metadata analysis and reverse image search (Serper)
+            print("📝 Analyzing with Gemini, metadata and reverse search...")
+            gemini_timeout = deadline.timeout(Config.IMAGE_GEMINI_TIMEOUT)
+            search_timeout = deadline.timeout(Config.IMAGE_REVERSE_SEARCH_TIMEOUT)
+            analyzers = [
+                ('metadata', self._analyze_metadata, deadline.timeout(Config.IMAGE_METADATA_TIMEOUT))
+            ]
+            if gemini_result is None:
+                analyzers.insert(0, (
+                    'gemini', partial(self._analyze_with_gemini, timeout=gemini_timeout), gemini_timeout
+                ))
+            if deadline.allows('reverse_search'):
+                analyzers.append((
+                    'reverse_search',
+                    partial(self._reverse_search_serper, timeout=search_timeout),
+                    search_timeout
+                ))
+            
+            results, incomplete = self._run_analyzers(analyzers, image)
+            if gemini_result is not None:
+                # Already run for the near-duplicate check
+                results['gemini'] = gemini_result
+                if gemini_result.get('failed'):
+                    incomplete.append('gemini')
+            results.setdefault(
+                'reverse_search',
+                self._fallback_result('reverse_search', 'skipped: time budget exhausted')
+            )
             
             # Step 4: Calculate Final Score
             print("⚖️ Calculating credibility score...")
             final_result = self._calculate_final_verdict(
-                gemini_result, 
-                metadata, 
-                reverse_result
+                results['gemini'], 
+                results['metadata'], 
+                results['reverse_search']
             )
+            final_result['incomplete_analyzers'] = incomplete
+            final_result['skipped_stages'] = deadline.skipped
             
-            return final_result
+            # Only complete verdicts are reused for later duplicates: never
+            # cache one built on a fallback Gemini or reverse-search result
+            degraded = any(results[name].get('failed') for name in results)
+            if not incomplete and not degraded and not final_result['skipped_stages']:
+                self.fingerprints.add(image, final_result)
+            
+            return dict(final_result, cached=False)
             
         except Exception as e:
             return {
@@ -70,12 +165,80 @@ class ImageVerificationService:
                 'confidence': 0
             }
     
-    def _analyze_with_gemini(self, image_path):
+    def _run_analyzers(self, analyzers, image):
+        """
+        Run (name, fn, timeout) analyzers concurrently
+        
+        Each analyzer gets its own timeout measured from the common start.
+        Slow or failing analyzers are replaced by a neutral fallback so the
+        verdict can still be calculated; analyzers that caught their own
+        error return a result flagged `failed`. Both count as incomplete.
+        Returns (results, incomplete names).
+        """
+        start = time.monotonic()
+        futures = [
+            (name, self._analyzer_pool.submit(fn, image), timeout)
+            for name, fn, timeout in analyzers
+        ]
+        
+        results = {}
+        incomplete = []
+        
+        for name, future, timeout in futures:
+            try:
+                results[name] = future.result(timeout=max(0, start + timeout - time.monotonic()))
+                if results[name].get('failed'):
+                    incomplete.append(name)
+            except FutureTimeout:
+                future.cancel()
+                print(f"⏱️ {name} analyzer timed out after {timeout}s")
+                results[name] = self._fallback_result(name, f'{name} timed out after {timeout}s')
+                incomplete.append(name)
+            except Exception as e:
+                print(f"❌ {name} analyzer error: {e}")
+                results[name] = self._fallback_result(name, f'{name} failed: {str(e)}')
+                incomplete.append(name)
+        
+        return results, incomplete
+    
+    def _same_text(self, text_a, text_b):
+        """True if two images' extracted text says the same thing"""
+        tokens_a, tokens_b = set(tokenize(text_a or '')), set(tokenize(text_b or ''))
+        if not tokens_a and not tokens_b:
+            return True
+        if differ_in_key_terms(tokens_a, key_terms(text_a or ''), tokens_b, key_terms(text_b or '')):
+            return False
+        return len(tokens_a & tokens_b) / len(tokens_a | tokens_b) >= Config.IMAGE_TEXT_SIMILARITY
+    
+    def _fallback_result(self, name, reason):
+        """Neutral stand-in for an analyzer that did not finish"""
+        if name == 'gemini':
+            return {
+                'extracted_text': '',
+                'image_type': 'unknown',
+                'manipulation_detected': False,
+                'claims': [],
+                'credibility_score': 50,
+                'red_flags': [f'Analysis incomplete: {reason}'],
+                'failed': True
+            }
+        if name == 'metadata':
+            return {
+                'has_metadata': False,
+                'red_flags': [f'Metadata incomplete: {reason}'],
+                'failed': True
+            }
+        return {
+            'matches_found': 0,
+            'error': reason,
+            'red_flags': [f'Reverse search incomplete: {reason}'],
+            'failed': True
+        }
+    
+    def _analyze_with_gemini(self, image, timeout=None):
         """Use Gemini Vision for OCR + AI analysis"""
         
         try:
-            img = Image.open(image_path)
-            
             prompt = """
             Analyze this image thoroughly for misinformation:
             
@@ -99,15 +262,18 @@ class ImageVerificationService:
             }
             """
             
-            response = self.gemini.generate_content(
-                [prompt, img],
-                generation_config={'temperature': 0.1}
+            analysis, _ = self.llm.generate_json(
+                '_analyze_with_gemini',
+                [prompt, image.blob(
+                    Config.IMAGE_MAX_DIMENSION,
+                    Config.IMAGE_UPLOAD_FORMAT,
+                    Config.IMAGE_UPLOAD_QUALITY
+                )],
+                llm_schemas.IMAGE_ANALYSIS,
+                generation_config={'temperature': 0.1},
+                timeout=timeout or Config.IMAGE_GEMINI_TIMEOUT
             )
             
-            result_text = response.text.strip()
-            result_text = result_text.replace('```json', '').replace('```', '').strip()
-            
-            analysis = json.loads(result_text)
             return analysis
             
         except Exception as e:
@@ -118,15 +284,15 @@ class ImageVerificationService:
                 'manipulation_detected': False,
                 'claims': [],
                 'credibility_score': 50,
-                'red_flags': [f'Analysis error: {str(e)}']
+                'red_flags': [f'Analysis error: {str(e)}'],
+                'failed': True
             }
     
-    def _analyze_metadata(self, image_path):
+    def _analyze_metadata(self, image):
         """Extract and analyze EXIF metadata"""
         
         try:
-            img = Image.open(image_path)
-            exif_data = img._getexif()
+            exif_data = image.exif()
             
             metadata = {
                 'has_metadata': False,
@@ -169,26 +335,29 @@ class ImageVerificationService:
         except Exception as e:
             return {
                 'has_metadata': False,
-                'red_flags': [f'Metadata error: {str(e)}']
+                'red_flags': [f'Metadata error: {str(e)}'],
+                'failed': True
             }
     
-    def _reverse_search_serper(self, image_path):
+    def _reverse_search_serper(self, image, timeout=15):
         """Reverse image search using Serper API"""
         
         if not self.serper_key:
+            # Skipped by configuration, not a failure: verdicts stay cacheable
             return {
                 'matches_found': 0,
-                'error': 'Serper API key not configured'
+                'error': 'Serper API key not configured',
+                'skipped': True
             }
         
         try:
-            # Convert image to base64
-            with open(image_path, 'rb') as img_file:
-                image_data = base64.b64encode(img_file.read()).decode('utf-8')
-            
-            # Determine image format
-            img_format = Image.open(image_path).format.lower()
-            mime_type = f"image/{img_format}"
+            # Convert downscaled image to base64
+            upload_data, mime_type = image.normalized(
+                Config.IMAGE_MAX_DIMENSION,
+                Config.IMAGE_UPLOAD_FORMAT,
+                Config.IMAGE_UPLOAD_QUALITY
+            )
+            image_data = base64.b64encode(upload_data).decode('utf-8')
             
             url = "https://google.serper.dev/images"
             
@@ -203,7 +372,7 @@ class ImageVerificationService:
                 'Content-Type': 'application/json'
             }
             
-            response = requests.post(url, headers=headers, data=payload, timeout=15)
+            response = self.http.post(url, headers=headers, data=payload, timeout=timeout, budget=timeout)
             data = response.json()
             
             result = {
@@ -219,13 +388,6 @@ class ImageVerificationService:
             if 'images' in data:
                 result['matches_found'] = len(data['images'])
                 
-                credible_domains = [
-                    'reuters.com', 'bbc.com', 'apnews.com', 'cnn.com',
-                    'nytimes.com', 'theguardian.com', 'washingtonpost.com',
-                    'aljazeera.com', 'npr.org', 'politifact.com',
-                    'snopes.com', 'factcheck.org'
-                ]
-                
                 unreliable_keywords = [
                     'fakenews', 'clickbait', 'viral', 'shocking',
                     'unbelievable', 'youwonotbelieve', 'breaking911'
@@ -246,12 +408,14 @@ class ImageVerificationService:
                     
                     # Check credibility
                     link_lower = source_info['link'].lower()
+                    rating = self.domain_registry.lookup(link_lower)
                     
-                    if any(domain in link_lower for domain in credible_domains):
+                    if rating and rating['category'] == 'credible':
                         result['credible_sources'].append(source_info)
                     
                     # Check for unreliable sources
-                    if any(keyword in link_lower for keyword in unreliable_keywords):
+                    if (rating and rating['category'] == 'unreliable') or \
+                            any(keyword in link_lower for keyword in unreliable_keywords):
                         result['red_flags'].append(
                             f"Found on suspicious site: {source_info['source']}"
                         )
@@ -280,7 +444,8 @@ class ImageVerificationService:
             return {
                 'matches_found': 0,
                 'error': str(e),
-                'red_flags': [f'Reverse search failed: {str(e)}']
+                'red_flags': [f'Reverse search failed: {str(e)}'],
+                'failed': True
             }
     
     def _calculate_final_verdict(self, gemini_result, metadata, reverse_result):
@@ -2,25 +2,53 @@
 
 import sys
 from pathlib import Path
-import google.generativeai as genai
-import requests
 import json
+from concurrent.futures import ThreadPoolExecutor
 
 # Add parent directory to path for imports
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
+from utils.claimreview_index import get_claimreview_index
 from utils.config import Config
+from utils.domain_registry import get_domain_registry
+from utils.evidence_packer import EvidencePacker, estimate_tokens
+from utils.http_client import get_http_client
+from utils import llm_schemas
+from utils.llm_gateway import get_llm_gateway, response_usage
+from utils.search_cache import get_search_cache, search_cache_key
 
 class RealtimeVerificationService:
     def __init__(self):
-        # Initialize Gemini
-        genai.configure(api_key=Config.GEMINI_API_KEY)
-        # Update your code to:
-        self.gemini = genai.GenerativeModel('gemini-flash-latest')
+        # Gemini, via the shared rate-limited gateway
+        self.llm = get_llm_gateway()
         
         # API keys
         self.serper_key = Config.SERPER_API_KEY
+        self.search_cache = get_search_cache()
+        self.http = get_http_client()
         self.factcheck_key = Config.GOOGLE_FACTCHECK_API_KEY
+        self.claimreview_index = get_claimreview_index()
+        
+        # Known credible / unreliable sources
+        self.domain_registry = get_domain_registry()
+        
+        # Per-claim evidence is ranked and fitted into a token budget
+        self.evidence_packer = EvidencePacker(
+            budget=Config.REALTIME_EVIDENCE_TOKEN_BUDGET,
+            max_item_tokens=Config.EVIDENCE_ITEM_MAX_TOKENS
+        )
+        
+        # Claims are verified concurrently; each claim's web and fact-checker
+        # searches run on a separate pool so claim workers never wait on
+        # their own pool
+        self._claim_pool = ThreadPoolExecutor(
+            max_workers=Config.REALTIME_CLAIM_MAX_WORKERS,
+            thread_name_prefix='realtime-claim'
+        )
+        self._lookup_pool = ThreadPoolExecutor(
+            max_workers=Config.REALTIME_CLAIM_MAX_WORKERS * 2,
+            thread_name_prefix='realtime-lookup'
+        )
     
     def verify_claim(self, text, content_type='text'):
         """Main verification method"""
@@ -36,11 +64,12 @@ class RealtimeVerificationService:
                     reasoning='No verifiable claims found'
                 )
             
-            # Step 2: Verify each claim
-            all_evidence = []
-            for claim in claims:
-                evidence = self._verify_single_claim(claim)
-                all_evidence.append(evidence)
+            # Step 2: Verify each claim (concurrently, results in claim order)
+            if Config.REALTIME_BATCH_ANALYSIS and len(claims) > 1:
+                evidence_sets = list(self._claim_pool.map(self._gather_evidence, claims))
+                all_evidence = self._analyze_evidence_batch(evidence_sets)
+            else:
+                all_evidence = list(self._claim_pool.map(self._verify_single_claim, claims))
             
             # Step 3: Final analysis
             result = self._aggregate_results(text, all_evidence)
@@ -67,15 +96,13 @@ class RealtimeVerificationService:
         """
         
         try:
-            response = self.gemini.generate_content(
+            claims, _ = self.llm.generate_json(
+                '_extract_claims',
                 prompt,
+                llm_schemas.EXTRACTED_CLAIMS,
                 generation_config={'temperature': 0.1}
             )
             
-            result_text = response.text.strip()
-            result_text = result_text.replace('```json', '').replace('```', '').strip()
-            
-            claims = json.loads(result_text)
             return [c for c in claims if c.get('verifiable', False)]
             
         except Exception as e:
@@ -84,21 +111,28 @@ class RealtimeVerificationService:
     
     def _verify_single_claim(self, claim):
         """Verify one claim using web search"""
-        query = f"{claim['subject']} {claim.get('type', '')}"
-        
-        # Web search
-        search_results = self._search_web(query)
-        
-        # Fact-check search
-        factcheck_results = []
-        if self.factcheck_key:
-            factcheck_results = self._search_factcheckers(claim['claim'])
+        claim, search_results, factcheck_results = self._gather_evidence(claim)
         
         # Analyze with Gemini
         verdict = self._analyze_evidence(claim, search_results, factcheck_results)
         
         return verdict
     
+    def _gather_evidence(self, claim):
+        """Return (claim, search_results, factcheck_results) for one claim"""
+        query = f"{claim['subject']} {claim.get('type', '')}"
+        
+        # Web search and fact-check search in parallel
+        search_future = self._lookup_pool.submit(self._search_web, query)
+        
+        factcheck_results = self._lookup_pool.submit(
+            self._search_factcheckers, claim['claim']
+        ).result()
+        
+        search_results = search_future.result()
+        
+        return claim, search_results, factcheck_results
+    
     def _search_web(self, query):
         """Search using Serper API"""
         url = "https://google.serper.dev/search"
@@ -114,19 +148,27 @@ class RealtimeVerificationService:
         }
         
         try:
-            response = requests.post(url, headers=headers, data=payload, timeout=5)
-            data = response.json()
+            cache_key = search_cache_key(query, num=10)
+            data = self.search_cache.get(cache_key)
+            
+            if data is None:
+                response = self.http.post(url, headers=headers, data=payload, timeout=5)
+                data = response.json()
+                if response.status_code == 200:
+                    self.search_cache.set(cache_key, data)
             
             results = []
             
             # Extract organic results
             if 'organic' in data:
                 for item in data['organic'][:10]:
+                    rating = self.domain_registry.lookup(item.get('link', ''))
                     results.append({
                         'title': item.get('title', ''),
                         'snippet': item.get('snippet', ''),
                         'link': item.get('link', ''),
-                        'source': item.get('link', '').split('/')[2] if '/' in item.get('link', '') else 'unknown'
+                        'source': item.get('link', '').split('/')[2] if '/' in item.get('link', '') else 'unknown',
+                        'source_rating': rating['category'] if rating else 'unrated'
                     })
             
             # Knowledge graph (Wikipedia, official data)
@@ -147,7 +189,11 @@ class RealtimeVerificationService:
             return []
     
     def _search_factcheckers(self, claim_text):
-        """Search Google Fact Check API"""
+        """Search the local ClaimReview index, then Google Fact Check API"""
+        local_results = self.claimreview_index.search(claim_text)
+        if local_results:
+            return local_results
+        
         if not self.factcheck_key:
             return []
         
@@ -159,7 +205,7 @@ class RealtimeVerificationService:
         }
         
         try:
-            response = requests.get(url, params=params, timeout=5)
+            response = self.http.get(url, params=params, timeout=5)
             data = response.json()
             
             results = []
@@ -182,15 +228,12 @@ class RealtimeVerificationService:
     
     def _analyze_evidence(self, claim, search_results, factcheck_results):
         """Use Gemini to analyze all evidence"""
+        evidence, token_usage = self._pack_evidence(claim, search_results, factcheck_results)
         
         prompt = f"""
         CLAIM: {claim['claim']}
         
-        WEB SEARCH RESULTS:
-        {json.dumps(search_results[:5], indent=2)}
-        
-        FACT-CHECKER RESULTS:
-        {json.dumps(factcheck_results, indent=2)}
+        {evidence}
         
         Analyze:
         1. Is this found in credible sources (Reuters, BBC, AP, CNN)?
@@ -209,23 +252,25 @@ class RealtimeVerificationService:
         """
         
         try:
-            response = self.gemini.generate_content(
+            analysis, response = self.llm.generate_json(
+                '_analyze_evidence',
                 prompt,
+                llm_schemas.EVIDENCE_VERDICT,
                 generation_config={'temperature': 0.1}
             )
             
-            result_text = response.text.strip()
-            result_text = result_text.replace('```json', '').replace('```', '').strip()
-            
-            analysis = json.loads(result_text)
-            
             return {
                 'claim': claim['claim'],
                 'verdict': analysis['verdict'],
                 'confidence': analysis['confidence'],
                 'reasoning': analysis['reasoning'],
                 'sources': analysis.get('credible_sources', []),
-                'red_flags': analysis.get('red_flags', [])
+                'red_flags': analysis.get('red_flags', []),
+                'token_usage': dict(
+                    token_usage,
+                    prompt_tokens_estimate=estimate_tokens(prompt),
+                    **response_usage(response)
+                )
             }
             
         except Exception as e:
@@ -239,6 +284,160 @@ class RealtimeVerificationService:
                 'red_flags': []
             }
     
+    def _analyze_evidence_batch(self, evidence_sets):
+        """
+        Analyze many claims' evidence with as few Gemini calls as possible
+        
+        Claims are packed into chunks that stay under
+        REALTIME_BATCH_TOKEN_BUDGET (estimated), each chunk is one call,
+        and any claim the model skips falls back to _analyze_evidence.
+        Returns verdicts in the same order as evidence_sets.
+        """
+        packed = [
+            self._evidence_block(i + 1, *evidence)
+            for i, evidence in enumerate(evidence_sets)
+        ]
+        blocks = [block for block, _ in packed]
+        
+        chunks = []
+        chunk, chunk_tokens = [], 0
+        for i, block in enumerate(blocks):
+            tokens = estimate_tokens(block)
+            if chunk and chunk_tokens + tokens > Config.REALTIME_BATCH_TOKEN_BUDGET:
+                chunks.append(chunk)
+                chunk, chunk_tokens = [], 0
+            chunk.append(i)
+            chunk_tokens += tokens
+        if chunk:
+            chunks.append(chunk)
+        
+        print(f"🤖 Analyzing {len(blocks)} claims in {len(chunks)} batched call(s)")
+        
+        verdicts = {}
+        for batch in self._claim_pool.map(
+            lambda ids: self._analyze_chunk(ids, blocks, evidence_sets), chunks
+        ):
+            verdicts.update(batch)
+        
+        for i, verdict in verdicts.items():
+            verdict['token_usage'] = dict(packed[i][1], **verdict.get('token_usage', {}))
+        
+        # Claims the model skipped get the single-claim path
+        missing = [i for i in range(len(evidence_sets)) if i not in verdicts]
+        for i, verdict in zip(missing, self._claim_pool.map(
+            lambda i: self._analyze_evidence(*evidence_sets[i]), missing
+        )):
+            verdicts[i] = verdict
+        
+        return [verdicts[i] for i in range(len(evidence_sets))]
+    
+    def _analyze_chunk(self, ids, blocks, evidence_sets):
+        """One Gemini call for a chunk of claims; returns {index: verdict}"""
+        evidence = "\n\n".join(blocks[i] for i in ids)
+        
+        prompt = f"""
+        Verify each numbered claim below using only the evidence listed under it.
+        
+        {evidence}
+        
+        For each claim analyze:
+        1. Is this found in credible sources (Reuters, BBC, AP, CNN)?
+        2. Do fact-checkers confirm or deny?
+        3. For recent events - is there news coverage?
+        4. Any contradictions?
+        
+        Return ONLY valid JSON with one entry per claim id:
+        {{
+            "results": [
+                {{
+                    "id": 1,
+                    "verdict": "TRUE/FALSE/UNCERTAIN",
+                    "confidence": 0-100,
+                    "reasoning": "2-3 sentences why",
+                    "credible_sources": ["list sources found"],
+                    "red_flags": ["issues found"]
+                }}
+            ]
+        }}
+        """
+        
+        try:
+            analysis, response = self.llm.generate_json(
+                '_analyze_chunk',
+                prompt,
+                llm_schemas.EVIDENCE_VERDICTS_BATCH,
+                generation_config={'temperature': 0.1}
+            )
+            
+        except Exception as e:
+            print(f"Batch analysis error: {e}")
+            return {}
+        
+        # The call's prompt usage is shared by every claim in the chunk
+        chunk_usage = {f'batch_{key}': value for key, value in response_usage(response).items()}
+        chunk_usage.update(batch_prompt_tokens_estimate=estimate_tokens(prompt), batched_claims=len(ids))
+        
+        verdicts = {}
+        for item in analysis.get('results', []):
+            try:
+                i = int(item['id']) - 1
+                if i in ids and i not in verdicts:
+                    verdicts[i] = {
+                        'claim': evidence_sets[i][0]['claim'],
+                        'verdict': item['verdict'],
+                        'confidence': item['confidence'],
+                        'reasoning': item['reasoning'],
+                        'sources': item.get('credible_sources', []),
+                        'red_flags': item.get('red_flags', []),
+                        'token_usage': dict(chunk_usage)
+                    }
+            except (KeyError, TypeError, ValueError) as e:
+                print(f"Skipping malformed batch verdict: {e}")
+        
+        return verdicts
+    
+    def _evidence_block(self, claim_id, claim, search_results, factcheck_results):
+        """(per-claim evidence section for the batched prompt, packing report)"""
+        evidence, token_usage = self._pack_evidence(claim, search_results, factcheck_results)
+        return f"CLAIM {claim_id}: {claim['claim']}\n{evidence}", token_usage
+    
+    def _pack_evidence(self, claim, search_results, factcheck_results):
+        """
+        Compact evidence text for one claim, plus its packing report
+        
+        Fact-checker ratings rank first; search snippets follow by
+        relevance and source reputation until the token budget is full.
+        """
+        items = [
+            {
+                'kind': 'factcheck',
+                'text': f"{f['publisher']}: \"{f['claim']}\" rated {f['rating']}",
+                'credibility': 100
+            }
+            for f in factcheck_results
+        ] + [
+            {
+                'kind': 'search',
+                'source': r['source'],
+                'text': f"{r['title']}: {r['snippet']}",
+                'credibility': (self.domain_registry.lookup(r['link']) or {}).get('score')
+            }
+            for r in search_results
+        ]
+        evidence, token_usage = self.evidence_packer.pack(claim['claim'], items)
+        
+        search_lines = [
+            f"- [{e['source']}] {e['text']}" for e in evidence if e['kind'] == 'search'
+        ]
+        factcheck_lines = [
+            f"- {e['text']}" for e in evidence if e['kind'] == 'factcheck'
+        ]
+        text = (
+            "WEB SEARCH RESULTS:\n" + ("\n".join(search_lines) or "- none") + "\n"
+            "FACT-CHECKER RESULTS:\n" + ("\n".join(factcheck_lines) or "- none")
+        )
+        return text, token_usage
+    
     def _aggregate_results(self, original_text, all_evidence):
         """Combine all claim verifications"""
         
@@ -0,0 +1,209 @@
+# app/utils/article_extractor.py
+
+import codecs
+import re
+from html.parser import HTMLParser
+
+CONTENT_CLASS = re.compile('article|content|post')
+WHITESPACE = re.compile(r'\s+')
+META_CHARSET = re.compile(rb'<meta[^>]+charset=["\']?([\w-]+)', re.I)
+SKIP_TAGS = {'script', 'style', 'noscript', 'template', 'svg'}
+VOID_TAGS = {
+    'area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input',
+    'link', 'meta', 'source', 'track', 'wbr'
+}
+
+
+class ArticleExtractor(HTMLParser):
+    """
+    Incremental title + paragraph extractor fed with HTML chunks.
+
+    Mirrors the old BeautifulSoup logic without building a tree: paragraphs
+    come from the first <article>, else the first <div> whose class matches
+    article|content|post, else the whole page. Only title, p and those
+    containers are tracked. `done` turns true once an <article> has yielded
+    enough text, so callers can stop reading the response early.
+    """
+
+    def __init__(self, max_paragraphs=10, max_chars=2000):
+        super().__init__(convert_charrefs=True)
+        self.max_paragraphs = max_paragraphs
+        self.max_chars = max_chars
+        self.title = ''
+        self.done = False
+
+        self._in_title = False
+        self._title_seen = False
+        self._skip_depth = 0
+        self._paragraph = None
+
+        # Container state: depth inside the first <article> / content <div>
+        self._article_depth = 0
+        self._article_nesting = 0
+        self._article_seen = False
+        self._div_depth = 0
+        self._div_nesting = 0
+        self._div_seen = False
+
+        self._paragraphs = {'article': [], 'div': [], 'page': []}
+        self._chars = {'article': 0, 'div': 0, 'page': 0}
+
+    def handle_starttag(self, tag, attrs):
+        if tag in SKIP_TAGS:
+            self._skip_depth += 1
+            return
+        if tag in VOID_TAGS:
+            return
+
+        if self._article_depth:
+            self._article_depth += 1
+            if tag == 'article':
+                self._article_nesting += 1
+        elif tag == 'article' and not self._article_seen:
+            self._article_seen = True
+            self._article_depth = 1
+
+        if self._div_depth:
+            self._div_depth += 1
+            if tag == 'div':
+                self._div_nesting += 1
+        elif tag == 'div' and not self._div_seen:
+            classes = dict(attrs).get('class') or ''
+            if any(CONTENT_CLASS.search(c) for c in classes.split()):
+                self._div_seen = True
+                self._div_depth = 1
+
+        if tag == 'title' and not self._title_seen:
+            self._in_title = True
+        elif tag == 'p':
+            self._close_paragraph()
+            self._paragraph = []
+
+    def handle_endtag(self, tag):
+        if tag in SKIP_TAGS:
+            self._skip_depth = max(0, self._skip_depth - 1)
+            return
+        if tag in VOID_TAGS:
+            return
+
+        if tag == 'title' and self._in_title:
+            self._in_title = False
+            self._title_seen = True
+            self.title = self.title.strip()
+        elif tag == 'p':
+            self._close_paragraph()
+
+        # A paragraph left open is closed while its container is still
+        # tracked, so it is counted as part of that container
+        if self._article_depth:
+            # Unclosed tags inside the article must not keep it open
+            if self._article_depth == 1 or (tag == 'article' and not self._article_nesting):
+                self._close_paragraph()
+                self._article_depth = 0
+                self.done = True
+            else:
+                self._article_depth -= 1
+                if tag == 'article':
+                    self._article_nesting -= 1
+        if self._div_depth:
+            if self._div_depth == 1 or (tag == 'div' and not self._div_nesting):
+                self._close_paragraph()
+                self._div_depth = 0
+            else:
+                self._div_depth -= 1
+                if tag == 'div':
+                    self._div_nesting -= 1
+
+    def handle_data(self, data):
+        if self._skip_depth:
+            return
+        if self._in_title:
+            self.title += data
+        elif self._paragraph is not None:
+            self._paragraph.append(data)
+
+    def close(self):
+        super().close()
+        self._close_paragraph()
+
+    def result(self):
+        """Return (title, content) using the same precedence as before"""
+        if self._article_seen:
+            paragraphs = self._paragraphs['article']
+        elif self._div_seen:
+            paragraphs = self._paragraphs['div']
+        else:
+            paragraphs = self._paragraphs['page']
+
+        content = WHITESPACE.sub(' ', ' '.join(paragraphs)).strip()
+        return WHITESPACE.sub(' ', self.title).strip(), content[:self.max_chars]
+
+    def _close_paragraph(self):
+        if self._paragraph is None:
+            return
+        text = ''.join(self._paragraph).strip()
+        self._paragraph = None
+
+        scopes = ['page']
+        if self._article_depth:
+            scopes.append('article')
+        if self._div_depth:
+            scopes.append('div')
+
+        for scope in scopes:
+            if len(self._paragraphs[scope]) < self.max_paragraphs:
+                self._paragraphs[scope].append(text)
+                self._chars[scope] += len(text)
+
+        if self._article_depth and (
+            len(self._paragraphs['article']) >= self.max_paragraphs or
+            self._chars['article'] >= self.max_chars
+        ):
+            self.done = True
+
+
+def extract_article(response, max_bytes, chunk_size=16384, max_paragraphs=10, max_chars=2000):
+    """
+    Stream a requests response into an ArticleExtractor
+
+    Reads at most max_bytes and stops as soon as the extractor has enough
+    text. Returns (title, content, bytes_read).
+    """
+    extractor = ArticleExtractor(max_paragraphs=max_paragraphs, max_chars=max_chars)
+    decoder = None
+    bytes_read = 0
+
+    for chunk in response.iter_content(chunk_size=chunk_size):
+        if not chunk:
+            continue
+        chunk = chunk[:max_bytes - bytes_read]
+        if decoder is None:
+            encoding = _detect_encoding(response, chunk)
+            decoder = codecs.getincrementaldecoder(encoding)(errors='replace')
+        bytes_read += len(chunk)
+        extractor.feed(decoder.decode(chunk))
+        if extractor.done or bytes_read >= max_bytes:
+            break
+
+    if decoder is not None:
+        extractor.feed(decoder.decode(b'', final=True))
+    extractor.close()
+
+    title, content = extractor.result()
+    return title, content, bytes_read
+
+
+def _detect_encoding(response, first_chunk):
+    """Charset from Content-Type, then <meta charset>, else UTF-8"""
+    encoding = None
+    if 'charset' in response.headers.get('Content-Type', '').lower():
+        encoding = response.encoding
+    else:
+        match = META_CHARSET.search(first_chunk[:4096])
+        if match:
+            encoding = match.group(1).decode('ascii', 'ignore')
+
+    try:
+        return codecs.lookup(encoding or 'utf-8').name
+    except LookupError:
+        return 'utf-8'
@@ -0,0 +1,97 @@
+# app/utils/article_store.py
+
+import threading
+import time
+from urllib.parse import urlparse, urlunparse, parse_qsl, urlencode
+
+from utils.cache import SQLiteTTLCache
+
+TRACKING_PARAMS = {'fbclid', 'gclid', 'dclid', 'msclkid', 'mc_cid', 'mc_eid', 'igshid', 'ref'}
+DEFAULT_PORTS = {'http': '80', 'https': '443'}
+
+
+def canonicalize_url(url):
+    """Scheme/host lowercased, default port, fragment and tracking params dropped"""
+    parts = urlparse(url.strip())
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or '').lower()
+    if parts.port and str(parts.port) != DEFAULT_PORTS.get(scheme):
+        host = f'{host}:{parts.port}'
+
+    query = sorted(
+        (key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if not key.lower().startswith('utm_') and key.lower() not in TRACKING_PARAMS
+    )
+    path = parts.path or '/'
+    if len(path) > 1:
+        path = path.rstrip('/')
+
+    return urlunparse((scheme, host, path, '', urlencode(query), ''))
+
+
+class ArticleStore:
+    """
+    Extracted {title, content, source} records keyed by canonical URL.
+
+    Entries younger than fresh_seconds are served locally. Older entries
+    keep their ETag / Last-Modified validators so the next fetch can be a
+    conditional GET; a 304 just renews the entry. Memory and disk are
+    bounded by the underlying SQLiteTTLCache.
+    """
+
+    def __init__(self, path, max_entries=500, max_disk_entries=5000,
+                 fresh_seconds=3600, ttl=7 * 24 * 3600):
+        self.fresh_seconds = fresh_seconds
+        self._cache = SQLiteTTLCache(
+            path,
+            table='articles',
+            max_entries=max_entries,
+            ttl=ttl,
+            max_disk_entries=max_disk_entries
+        )
+        self._lock = threading.Lock()
+        self._counters = {'fresh_hits': 0, 'revalidated': 0, 'fetched': 0}
+
+    def lookup(self, url):
+        """Return (entry, is_fresh); entry is None when nothing is stored"""
+        entry = self._cache.get(canonicalize_url(url))
+        if entry is None:
+            return None, False
+
+        fresh = time.time() - entry['validated_at'] < self.fresh_seconds
+        if fresh:
+            self._count('fresh_hits')
+        return entry, fresh
+
+    def conditional_headers(self, entry):
+        """If-None-Match / If-Modified-Since headers for a stored entry"""
+        headers = {}
+        if entry and entry.get('etag'):
+            headers['If-None-Match'] = entry['etag']
+        if entry and entry.get('last_modified'):
+            headers['If-Modified-Since'] = entry['last_modified']
+        return headers
+
+    def revalidated(self, url, entry):
+        """Record a 304: the stored record is still current"""
+        self._count('revalidated')
+        self._cache.set(canonicalize_url(url), dict(entry, validated_at=time.time()))
+
+    def store(self, url, record, response_headers):
+        self._count('fetched')
+        self._cache.set(canonicalize_url(url), {
+            'record': record,
+            'etag': response_headers.get('ETag'),
+            'last_modified': response_headers.get('Last-Modified'),
+            'validated_at': time.time()
+        })
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._counters)
+        stats.update(self._cache.stats())
+        return stats
+
+    def _count(self, name):
+        with self._lock:
+            self._counters[name] += 1
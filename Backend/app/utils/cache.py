@@ -0,0 +1,301 @@
+# app/utils/cache.py
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+
+class TTLCache:
+    """Thread-safe in-memory cache with per-entry TTL and LRU eviction"""
+
+    def __init__(self, max_entries=1024, ttl=3600):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()  # key -> (value, stored_at, expires_at)
+        self._lock = threading.RLock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key, default=None):
+        """Return cached value or default"""
+        entry = self.get_entry(key)
+        return entry[0] if entry else default
+
+    def get_entry(self, key):
+        """Return (value, stored_at) for a live entry, or None"""
+        with self._lock:
+            entry = self._get_live(key)
+            if entry is None:
+                entry = self._load(key)
+                if entry is not None:
+                    self._remember(key, *entry)
+
+            if entry is None:
+                self.misses += 1
+                return None
+
+            self.hits += 1
+            return entry[0], entry[1]
+
+    def peek(self, key):
+        """Like get_entry, but leaves counters and LRU order untouched"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[2] <= time.time():
+                return None
+            return entry[0], entry[1]
+
+    def set(self, key, value, ttl=None):
+        """Store value, evicting least recently used entries when full"""
+        now = time.time()
+        expires_at = now + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._remember(key, value, now, expires_at)
+            self._store(key, value, now, expires_at)
+
+    def delete(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+            self._remove(key)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._remove_all()
+
+    def items(self):
+        """Snapshot of live (key, value) pairs in memory"""
+        now = time.time()
+        with self._lock:
+            return [
+                (key, entry[0]) for key, entry in self._entries.items()
+                if entry[2] > now
+            ]
+
+    def items_with_age(self):
+        """Snapshot of live (key, value, stored_at) triples in memory"""
+        now = time.time()
+        with self._lock:
+            return [
+                (key, entry[0], entry[1]) for key, entry in self._entries.items()
+                if entry[2] > now
+            ]
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 3) if lookups else 0.0,
+                'evictions': self.evictions
+            }
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        with self._lock:
+            return self._get_live(key) is not None
+
+    def _get_live(self, key):
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry[2] <= time.time():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return entry
+
+    def _remember(self, key, value, stored_at, expires_at):
+        self._entries[key] = (value, stored_at, expires_at)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            evicted, _ = self._entries.popitem(last=False)
+            self.evictions += 1
+            self._evicted(evicted)
+
+    # Storage hooks - no-ops for the in-memory cache
+
+    def _evicted(self, key):
+        pass
+
+    def _load(self, key):
+        return None
+
+    def _store(self, key, value, stored_at, expires_at):
+        pass
+
+    def _remove(self, key):
+        pass
+
+    def _remove_all(self):
+        pass
+
+
+class SizedTTLCache(TTLCache):
+    """TTLCache of bytes values that also evicts LRU entries past max_bytes in total"""
+
+    def __init__(self, max_bytes, max_entries=1024, ttl=3600):
+        super().__init__(max_entries=max_entries, ttl=ttl)
+        self.max_bytes = max_bytes
+
+    def total_bytes(self):
+        with self._lock:
+            return sum(len(entry[0]) for entry in self._entries.values())
+
+    def stats(self):
+        stats = super().stats()
+        stats['bytes'] = self.total_bytes()
+        stats['max_bytes'] = self.max_bytes
+        return stats
+
+    def _remember(self, key, value, stored_at, expires_at):
+        super()._remember(key, value, stored_at, expires_at)
+        total = self.total_bytes()
+        while total > self.max_bytes and self._entries:
+            key, (evicted, _, _) = self._entries.popitem(last=False)
+            total -= len(evicted)
+            self.evictions += 1
+            self._evicted(key)
+
+
+class SQLiteTTLCache(TTLCache):
+    """
+    TTLCache backed by a SQLite table so entries survive restarts.
+
+    Memory holds the hot set; the table holds up to max_disk_entries JSON
+    values and is pruned by expiry first, then by least recent write.
+    Falls back to memory-only if the database cannot be opened.
+    `on_evict(keys)` is called with the keys that leave the store for
+    good (pruned rows, or memory evictions when there is no database),
+    so indexes built over the entries can drop them too.
+    """
+
+    PRUNE_EVERY = 100
+
+    def __init__(self, path, table='cache', max_entries=1024, ttl=3600, max_disk_entries=None,
+                 on_evict=None):
+        super().__init__(max_entries=max_entries, ttl=ttl)
+        self.path = path
+        self.on_evict = on_evict
+        self.table = table
+        self.max_disk_entries = max_disk_entries or max_entries * 10
+        self._writes = 0
+        self._db = None
+
+        try:
+            os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+            self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+            self._db.execute('PRAGMA journal_mode=WAL')
+            self._db.execute(
+                f'CREATE TABLE IF NOT EXISTS {table} ('
+                'key TEXT PRIMARY KEY, value TEXT NOT NULL, '
+                'stored_at REAL NOT NULL, expires_at REAL NOT NULL)'
+            )
+            self._db.execute(
+                f'CREATE INDEX IF NOT EXISTS {table}_expires ON {table} (expires_at)'
+            )
+        except (sqlite3.Error, OSError) as e:
+            print(f"⚠️ Cache database unavailable ({path}): {e} - using memory only")
+            self._db = None
+
+    def stats(self):
+        stats = super().stats()
+        stats['persistent'] = self._db is not None
+        if self._db is not None:
+            with self._lock:
+                stats['disk_entries'] = self._db.execute(
+                    f'SELECT COUNT(*) FROM {self.table}'
+                ).fetchone()[0]
+        return stats
+
+    def disk_items(self):
+        """All live (key, value, stored_at) rows on disk, for rebuilding indexes"""
+        if self._db is None:
+            return self.items_with_age()
+        with self._lock:
+            rows = self._db.execute(
+                f'SELECT key, value, stored_at FROM {self.table} WHERE expires_at > ?',
+                (time.time(),)
+            ).fetchall()
+        return [(key, json.loads(value), stored_at) for key, value, stored_at in rows]
+
+    def _load(self, key):
+        if self._db is None:
+            return None
+        try:
+            row = self._db.execute(
+                f'SELECT value, stored_at, expires_at FROM {self.table} '
+                'WHERE key = ? AND expires_at > ?',
+                (key, time.time())
+            ).fetchone()
+        except sqlite3.Error as e:
+            print(f"⚠️ Cache read error: {e}")
+            return None
+        if row is None:
+            return None
+        return json.loads(row[0]), row[1], row[2]
+
+    def _store(self, key, value, stored_at, expires_at):
+        if self._db is None:
+            return
+        try:
+            self._db.execute(
+                f'INSERT OR REPLACE INTO {self.table} (key, value, stored_at, expires_at) '
+                'VALUES (?, ?, ?, ?)',
+                (key, json.dumps(value), stored_at, expires_at)
+            )
+            self._writes += 1
+            if self._writes % self.PRUNE_EVERY == 0:
+                self._prune()
+        except (sqlite3.Error, TypeError, ValueError) as e:
+            print(f"⚠️ Cache write error: {e}")
+
+    def _remove(self, key):
+        if self._db is not None:
+            self._db.execute(f'DELETE FROM {self.table} WHERE key = ?', (key,))
+
+    def _remove_all(self):
+        if self._db is not None:
+            self._db.execute(f'DELETE FROM {self.table}')
+
+    def _evicted(self, key):
+        # With a database, memory evictions stay on disk
+        if self._db is None and self.on_evict:
+            self.on_evict([key])
+
+    def _prune(self):
+        """Drop expired rows, then the oldest rows above max_disk_entries"""
+        if self.on_evict is None:
+            self._db.execute(f'DELETE FROM {self.table} WHERE expires_at <= ?', (time.time(),))
+            self._db.execute(
+                f'DELETE FROM {self.table} WHERE key IN ('
+                f'SELECT key FROM {self.table} ORDER BY stored_at DESC LIMIT -1 OFFSET ?)',
+                (self.max_disk_entries,)
+            )
+            return
+
+        # Same rows, selected first so the callback learns which keys went
+        keys = [row[0] for row in self._db.execute(
+            f'SELECT key FROM {self.table} WHERE expires_at <= ?', (time.time(),)
+        )]
+        self._db.executemany(f'DELETE FROM {self.table} WHERE key = ?', [(key,) for key in keys])
+        overflow = [row[0] for row in self._db.execute(
+            f'SELECT key FROM {self.table} ORDER BY stored_at DESC LIMIT -1 OFFSET ?',
+            (self.max_disk_entries,)
+        )]
+        self._db.executemany(f'DELETE FROM {self.table} WHERE key = ?', [(key,) for key in overflow])
+        keys.extend(overflow)
+
+        for key in keys:
+            self._entries.pop(key, None)
+        if keys:
+            self.on_evict(keys)
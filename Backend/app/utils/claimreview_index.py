@@ -0,0 +1,248 @@
+# app/utils/claimreview_index.py
+
+import json
+import os
+import threading
+import time
+
+from utils.config import Config
+from utils.text import differ_in_key_terms, key_terms, normalize_text, tokenize
+from utils.text_index import BM25Index
+
+DUMP_EXTENSIONS = ('.json', '.jsonl', '.ndjson')
+
+
+def _rating_of(review):
+    rating = review.get('reviewRating') or {}
+    if isinstance(rating, dict):
+        return rating.get('alternateName') or rating.get('name') or ''
+    return str(rating)
+
+
+def _name_of(entity):
+    if isinstance(entity, list):
+        entity = entity[0] if entity else {}
+    if isinstance(entity, dict):
+        return entity.get('name') or entity.get('site') or ''
+    return str(entity or '')
+
+
+def iter_reviews(item):
+    """
+    Yield {claim, rating, publisher, url} from one parsed dump object.
+
+    Understands Fact Check Tools API exports ({"claims": [...]} or single
+    claim objects with a "claimReview" list), schema.org ClaimReview
+    markup, and DataFeed wrappers ({"dataFeedElement": [{"item": [...]}]}).
+    """
+    if isinstance(item, list):
+        for child in item:
+            yield from iter_reviews(child)
+        return
+    if not isinstance(item, dict):
+        return
+
+    for container in ('claims', 'dataFeedElement', 'item', '@graph'):
+        if isinstance(item.get(container), list):
+            yield from iter_reviews(item[container])
+            return
+
+    if 'claimReview' in item:
+        # Fact Check Tools API shape
+        for review in item.get('claimReview') or []:
+            yield {
+                'claim': item.get('text', ''),
+                'rating': review.get('textualRating', ''),
+                'publisher': _name_of(review.get('publisher')),
+                'url': review.get('url', '')
+            }
+    elif 'claimReviewed' in item:
+        # schema.org ClaimReview
+        yield {
+            'claim': item.get('claimReviewed', ''),
+            'rating': _rating_of(item),
+            'publisher': _name_of(item.get('author') or item.get('publisher')),
+            'url': item.get('url', '')
+        }
+
+
+class ClaimReviewIndex:
+    """
+    Local fact-check lookups over ClaimReview dumps.
+
+    Reviews are grouped by normalized claim text and each claim is indexed
+    once in a BM25 index. Dumps in `dumps_dir` are ingested at startup and
+    the directory is rescanned in the background every `rescan_seconds`;
+    only new or changed files are read, and reviews already indexed are
+    skipped, so new dumps can simply be dropped in. A hit counts as
+    confident when at least `min_coverage` of the query's content words
+    appear in the claim and of the claim's in the query, and the two do
+    not differ in a negation, number or name. At most `max_reviews`
+    reviews are returned.
+    """
+
+    def __init__(self, dumps_dir=None, min_coverage=0.6, max_results=5, rescan_seconds=300,
+                 max_reviews=10):
+        self.dumps_dir = dumps_dir
+        self.min_coverage = min_coverage
+        self.max_results = max_results
+        self.max_reviews = max_reviews
+        self.rescan_seconds = rescan_seconds
+
+        self._index = BM25Index()
+        self._claims = {}      # normalized claim -> {'claim', 'reviews'}
+        self._review_keys = set()
+        self._files = {}       # path -> (mtime, size) already ingested
+        self._lock = threading.Lock()
+        self._scan_lock = threading.Lock()
+        self._last_scan = 0.0
+        self._counters = {'local_hits': 0, 'local_misses': 0, 'reviews_ingested': 0}
+
+        if dumps_dir:
+            self.scan()
+
+    def add_review(self, review):
+        """Index one {claim, rating, publisher, url} record; False if skipped"""
+        claim = (review.get('claim') or '').strip()
+        key = normalize_text(claim)
+        if not key or not review.get('rating'):
+            return False
+
+        review_key = (key, review.get('url', ''), review.get('rating', ''))
+        with self._lock:
+            if review_key in self._review_keys:
+                return False
+            self._review_keys.add(review_key)
+
+            entry = self._claims.get(key)
+            if entry is None:
+                entry = self._claims[key] = {'claim': claim, 'reviews': []}
+                self._index.add(key, claim)
+            entry['reviews'].append({
+                'claim': claim,
+                'rating': review.get('rating', ''),
+                'publisher': review.get('publisher', ''),
+                'url': review.get('url', '')
+            })
+            self._counters['reviews_ingested'] += 1
+        return True
+
+    def ingest_file(self, path):
+        """Ingest a JSON or JSONL dump; returns the number of new reviews"""
+        added = 0
+        with open(path, encoding='utf-8') as f:
+            if path.endswith('.json'):
+                for review in iter_reviews(json.load(f)):
+                    added += self.add_review(review)
+            else:
+                for line in f:
+                    line = line.strip()
+                    if not line:
+                        continue
+                    try:
+                        item = json.loads(line)
+                    except ValueError:
+                        continue
+                    for review in iter_reviews(item):
+                        added += self.add_review(review)
+        return added
+
+    def scan(self):
+        """Ingest dumps in dumps_dir that are new or changed since the last scan"""
+        self._last_scan = time.time()
+        if not self.dumps_dir or not os.path.isdir(self.dumps_dir):
+            return 0
+
+        added = 0
+        for name in sorted(os.listdir(self.dumps_dir)):
+            path = os.path.join(self.dumps_dir, name)
+            if not name.lower().endswith(DUMP_EXTENSIONS) or not os.path.isfile(path):
+                continue
+
+            stat = os.stat(path)
+            signature = (stat.st_mtime, stat.st_size)
+            if self._files.get(path) == signature:
+                continue
+
+            try:
+                count = self.ingest_file(path)
+                print(f"✅ Indexed {count} new fact-checks from {name}")
+                added += count
+            except (OSError, ValueError) as e:
+                print(f"⚠️ Could not ingest fact-check dump {name}: {e}")
+            self._files[path] = signature
+
+        return added
+
+    def search(self, claim_text):
+        """Reviews for confidently matching claims, best first ([] if none)"""
+        self._maybe_rescan()
+
+        tokens = set(tokenize(claim_text))
+        terms = key_terms(claim_text)
+        hits = self._index.search(claim_text, k=self.max_results)
+        results = []
+        with self._lock:
+            for key, _score, coverage in hits:
+                if coverage < self.min_coverage:
+                    continue
+                # A short query must not vouch for a long, loosely related claim
+                claim_tokens = self._index.terms(key)
+                if len(tokens & claim_tokens) / len(claim_tokens) < self.min_coverage:
+                    continue
+                claim = self._claims[key]['claim']
+                if differ_in_key_terms(tokens, terms, claim_tokens, key_terms(claim)):
+                    continue
+                results.extend(self._claims[key]['reviews'][:self.max_reviews - len(results)])
+                if len(results) >= self.max_reviews:
+                    break
+            self._counters['local_hits' if results else 'local_misses'] += 1
+        return results
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._counters)
+            stats.update({
+                'claims': len(self._claims),
+                'files': len(self._files),
+                'min_coverage': self.min_coverage
+            })
+        return stats
+
+    def _maybe_rescan(self):
+        if not self.dumps_dir or time.time() - self._last_scan < self.rescan_seconds:
+            return
+        # Rescan off the request thread; searches use the current index meanwhile
+        if self._scan_lock.acquire(blocking=False):
+            self._last_scan = time.time()
+            threading.Thread(target=self._rescan, name='claimreview-rescan', daemon=True).start()
+
+    def _rescan(self):
+        try:
+            self.scan()
+        except Exception as e:
+            print(f"⚠️ Fact-check dump rescan failed: {e}")
+        finally:
+            self._scan_lock.release()
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_claimreview_index():
+    """Process-wide index over the dumps in Config.FACTCHECK_DUMPS_DIR"""
+    global _index
+
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                _index = ClaimReviewIndex(
+                    dumps_dir=Config.FACTCHECK_DUMPS_DIR,
+                    min_coverage=Config.FACTCHECK_INDEX_MIN_COVERAGE,
+                    max_results=Config.FACTCHECK_INDEX_MAX_RESULTS,
+                    rescan_seconds=Config.FACTCHECK_INDEX_RESCAN,
+                    max_reviews=Config.FACTCHECK_INDEX_MAX_REVIEWS
+                )
+
+    return _index
@@ -5,8 +5,8 @@ from dotenv import load_dotenv
 
 load_dotenv()
 
-# Upload folder path
-UPLOAD_FOLDER = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), 'uploads')
+# Bundled data files
+DATA_FOLDER = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'data')
 
 class Config:
     # Existing configs
@@ -15,7 +15,134 @@ class Config:
     # NEW: Add these API keys
     GEMINI_API_KEY = os.getenv('GEMINI_API_KEY')
     SERPER_API_KEY = os.getenv('SERPER_API_KEY')
+    GOOGLE_FACTCHECK_API_KEY = os.getenv('GOOGLE_FACTCHECK_API_KEY')
    
-    # Verification settings
-    VERIFICATION_TIMEOUT = 10
-    MAX_SEARCH_RESULTS = 10
\ No newline at end of file
+    # Gemini access: every call goes through utils.llm_gateway
+    GEMINI_MODEL = os.getenv('GEMINI_MODEL', 'gemini-flash-latest')
+    LLM_RATE_PER_MINUTE = int(os.getenv('LLM_RATE_PER_MINUTE', 60))
+    LLM_BURST = int(os.getenv('LLM_BURST', 10))
+    LLM_MAX_CONCURRENT = int(os.getenv('LLM_MAX_CONCURRENT', 8))
+    LLM_TIMEOUT = float(os.getenv('LLM_TIMEOUT', 30))
+    LLM_RETRIES = int(os.getenv('LLM_RETRIES', 2))
+    LLM_BACKOFF = float(os.getenv('LLM_BACKOFF', 1.0))
+
+    # Verification settings: end-to-end budget per request (seconds), with
+    # time kept back for the final Gemini verdict when sizing earlier stages
+    VERIFICATION_TIMEOUT = float(os.getenv('VERIFICATION_TIMEOUT', 30))
+    VERDICT_TIME_RESERVE = float(os.getenv('VERDICT_TIME_RESERVE', 8))
+    MAX_SEARCH_RESULTS = 10
+
+    # Prompt evidence budgets (estimated tokens). Defaults keep prompts at
+    # or below the old fixed slices: 5 snippets[:150] + 3 articles[:500]
+    # for text (~735), a 1500-char article + 5 titles for URLs (~475)
+    EVIDENCE_TOKEN_BUDGET = int(os.getenv('EVIDENCE_TOKEN_BUDGET', 600))
+    EVIDENCE_ITEM_MAX_TOKENS = int(os.getenv('EVIDENCE_ITEM_MAX_TOKENS', 125))
+    ARTICLE_TOKEN_BUDGET = int(os.getenv('ARTICLE_TOKEN_BUDGET', 350))
+    URL_EVIDENCE_TOKEN_BUDGET = int(os.getenv('URL_EVIDENCE_TOKEN_BUDGET', 100))
+    URL_EVIDENCE_ITEM_MAX_TOKENS = int(os.getenv('URL_EVIDENCE_ITEM_MAX_TOKENS', 25))
+    REALTIME_EVIDENCE_TOKEN_BUDGET = int(os.getenv('REALTIME_EVIDENCE_TOKEN_BUDGET', 600))
+
+    # Concurrency settings
+    CONCURRENT_PIPELINE = os.getenv('CONCURRENT_PIPELINE', 'true').lower() == 'true'
+    PIPELINE_MAX_WORKERS = int(os.getenv('PIPELINE_MAX_WORKERS', 8))
+    SCRAPE_MAX_WORKERS = int(os.getenv('SCRAPE_MAX_WORKERS', 6))
+    DOMAIN_RATING_MAX_WORKERS = int(os.getenv('DOMAIN_RATING_MAX_WORKERS', 4))
+    BATCH_MAX_WORKERS = int(os.getenv('BATCH_MAX_WORKERS', 8))
+    BATCH_MAX_CLAIMS = int(os.getenv('BATCH_MAX_CLAIMS', 500))
+    IMAGE_ANALYZER_MAX_WORKERS = int(os.getenv('IMAGE_ANALYZER_MAX_WORKERS', 6))
+    REALTIME_CLAIM_MAX_WORKERS = int(os.getenv('REALTIME_CLAIM_MAX_WORKERS', 4))
+    REALTIME_BATCH_ANALYSIS = os.getenv('REALTIME_BATCH_ANALYSIS', 'true').lower() == 'true'
+    REALTIME_BATCH_TOKEN_BUDGET = int(os.getenv('REALTIME_BATCH_TOKEN_BUDGET', 6000))
+    MAX_IMAGE_UPLOAD_BYTES = int(os.getenv('MAX_IMAGE_UPLOAD_BYTES', 15 * 1024 * 1024))
+
+    # Image payload sent to Gemini / reverse search (EXIF uses the original,
+    # IMAGE_MAX_DIMENSION=0 sends the original bytes)
+    IMAGE_MAX_DIMENSION = int(os.getenv('IMAGE_MAX_DIMENSION', 1600))
+    IMAGE_UPLOAD_FORMAT = os.getenv('IMAGE_UPLOAD_FORMAT', 'JPEG')
+    IMAGE_UPLOAD_QUALITY = int(os.getenv('IMAGE_UPLOAD_QUALITY', 85))
+
+    # Near-duplicate image verdict index (dHash Hamming radius out of 64 bits)
+    IMAGE_INDEX_TTL = int(os.getenv('IMAGE_INDEX_TTL', 7 * 24 * 3600))
+    IMAGE_INDEX_MAX_ENTRIES = int(os.getenv('IMAGE_INDEX_MAX_ENTRIES', 2000))
+    IMAGE_HASH_RADIUS = int(os.getenv('IMAGE_HASH_RADIUS', 6))
+    # Near (non-exact) matches are reused only if the extracted text agrees
+    IMAGE_TEXT_SIMILARITY = float(os.getenv('IMAGE_TEXT_SIMILARITY', 0.8))
+
+    # Downloaded image cache for /verify/image/url (raw bytes held in memory)
+    IMAGE_URL_CACHE_TTL = int(os.getenv('IMAGE_URL_CACHE_TTL', 3600))
+    IMAGE_URL_CACHE_MAX_ENTRIES = int(os.getenv('IMAGE_URL_CACHE_MAX_ENTRIES', 50))
+    IMAGE_URL_CACHE_MAX_BYTES = int(os.getenv('IMAGE_URL_CACHE_MAX_BYTES', 64 * 1024 * 1024))
+    # Total time for one image download, retries and body included (seconds)
+    IMAGE_FETCH_TIMEOUT = float(os.getenv('IMAGE_FETCH_TIMEOUT', 15))
+
+    # Image analyzer timeouts (seconds)
+    IMAGE_GEMINI_TIMEOUT = float(os.getenv('IMAGE_GEMINI_TIMEOUT', 30))
+    IMAGE_METADATA_TIMEOUT = float(os.getenv('IMAGE_METADATA_TIMEOUT', 5))
+    IMAGE_REVERSE_SEARCH_TIMEOUT = float(os.getenv('IMAGE_REVERSE_SEARCH_TIMEOUT', 20))
+
+    # Scraping settings
+    SCRAPE_MAX_BYTES = int(os.getenv('SCRAPE_MAX_BYTES', 1024 * 1024))
+    ARTICLE_FRESH_SECONDS = int(os.getenv('ARTICLE_FRESH_SECONDS', 3600))
+    ARTICLE_STORE_TTL = int(os.getenv('ARTICLE_STORE_TTL', 7 * 24 * 3600))
+    ARTICLE_STORE_MAX_ENTRIES = int(os.getenv('ARTICLE_STORE_MAX_ENTRIES', 500))
+    ARTICLE_STORE_MAX_DISK_ENTRIES = int(os.getenv('ARTICLE_STORE_MAX_DISK_ENTRIES', 5000))
+
+    # Cache settings
+    CACHE_DIR = os.getenv('CACHE_DIR', '/tmp/fakecheck_cache')
+    DOMAIN_CACHE_TTL = int(os.getenv('DOMAIN_CACHE_TTL', 7 * 24 * 3600))
+    DOMAIN_CACHE_MAX_ENTRIES = int(os.getenv('DOMAIN_CACHE_MAX_ENTRIES', 5000))
+    DOMAIN_RATING_BATCH_SIZE = int(os.getenv('DOMAIN_RATING_BATCH_SIZE', 15))
+    SEARCH_CACHE_TTL = int(os.getenv('SEARCH_CACHE_TTL', 30 * 60))
+    SEARCH_CACHE_MAX_ENTRIES = int(os.getenv('SEARCH_CACHE_MAX_ENTRIES', 2000))
+    VERDICT_CACHE_TTL = int(os.getenv('VERDICT_CACHE_TTL', 6 * 3600))
+    VERDICT_CACHE_MAX_ENTRIES = int(os.getenv('VERDICT_CACHE_MAX_ENTRIES', 2000))
+    VERDICT_CACHE_SIMILARITY = float(os.getenv('VERDICT_CACHE_SIMILARITY', 0.9))
+
+    # Domain reputation data (bundled file plus comma-separated extras)
+    DOMAIN_RATINGS_FILES = [os.path.join(DATA_FOLDER, 'domain_ratings.json')] + [
+        path for path in os.getenv('DOMAIN_RATINGS_FILES', '').split(',') if path
+    ]
+
+    # Knowledge base of every claim this service has verified
+    CLAIM_KB_TTL = int(os.getenv('CLAIM_KB_TTL', 30 * 24 * 3600))
+    CLAIM_KB_MAX_ENTRIES = int(os.getenv('CLAIM_KB_MAX_ENTRIES', 2000))
+    CLAIM_KB_MAX_DISK_ENTRIES = int(os.getenv('CLAIM_KB_MAX_DISK_ENTRIES', 50000))
+    CLAIM_KB_TOP_K = int(os.getenv('CLAIM_KB_TOP_K', 3))
+    CLAIM_KB_MIN_COVERAGE = float(os.getenv('CLAIM_KB_MIN_COVERAGE', 0.5))
+    CLAIM_KB_ANSWER_SIMILARITY = float(os.getenv('CLAIM_KB_ANSWER_SIMILARITY', 0.9))
+    CLAIM_KB_ANSWER_MAX_AGE = int(os.getenv('CLAIM_KB_ANSWER_MAX_AGE', 24 * 3600))
+
+    # Local ClaimReview index consulted before the Fact Check Tools API
+    FACTCHECK_DUMPS_DIR = os.getenv('FACTCHECK_DUMPS_DIR', os.path.join(DATA_FOLDER, 'claimreview'))
+    FACTCHECK_INDEX_MIN_COVERAGE = float(os.getenv('FACTCHECK_INDEX_MIN_COVERAGE', 0.6))
+    FACTCHECK_INDEX_MAX_RESULTS = int(os.getenv('FACTCHECK_INDEX_MAX_RESULTS', 5))
+    FACTCHECK_INDEX_RESCAN = int(os.getenv('FACTCHECK_INDEX_RESCAN', 300))
+    FACTCHECK_INDEX_MAX_REVIEWS = int(os.getenv('FACTCHECK_INDEX_MAX_REVIEWS', 10))
+
+    # Outbound HTTP settings ("host=size,host=size" for per-host pools)
+    HTTP_TIMEOUT = float(os.getenv('HTTP_TIMEOUT', 10))
+    HTTP_RETRIES = int(os.getenv('HTTP_RETRIES', 2))
+    HTTP_BACKOFF = float(os.getenv('HTTP_BACKOFF', 0.3))
+    # Hosts with a cached connection pool, and connections kept per host
+    HTTP_POOL_HOSTS = int(os.getenv('HTTP_POOL_HOSTS', 100))
+    HTTP_POOL_SIZE = int(os.getenv('HTTP_POOL_SIZE', 10))
+    HTTP_HOST_POOL_SIZES = {
+        host.strip(): int(size)
+        for host, size in (
+            item.split('=') for item in
+            os.getenv('HTTP_HOST_POOL_SIZES', 'google.serper.dev=20').split(',') if '=' in item
+        )
+    }
+
+    # Async job settings. Jobs live in one process's memory, so they only
+    # work on a long-running server; on Vercel (VERCEL is set) each request
+    # may hit a different, short-lived instance, and async requests run
+    # synchronously instead.
+    ASYNC_JOBS_ENABLED = os.getenv(
+        'ASYNC_JOBS_ENABLED', 'false' if os.getenv('VERCEL') else 'true'
+    ).lower() == 'true'
+    JOB_MAX_WORKERS = int(os.getenv('JOB_MAX_WORKERS', 4))
+    JOB_MAX_PENDING = int(os.getenv('JOB_MAX_PENDING', 100))
+    JOB_TTL = int(os.getenv('JOB_TTL', 600))
+    # Image bytes held by queued/running jobs (raw uploads, up to 15 MB each)
+    JOB_MAX_PENDING_BYTES = int(os.getenv('JOB_MAX_PENDING_BYTES', 150 * 1024 * 1024))
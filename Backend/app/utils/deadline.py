@@ -0,0 +1,53 @@
+# app/utils/deadline.py
+
+import threading
+import time
+
+
+class Deadline:
+    """
+    Time budget for one verification request.
+
+    Stages size their timeouts with timeout(cap, reserve): their own cap or
+    whatever is left after keeping `reserve` seconds for the stages that
+    must still run, whichever is smaller. Optional stages call
+    allows(stage, reserve) first; when the budget is too low they are
+    recorded in `skipped` and left out. seconds=None means no budget.
+    """
+
+    MIN_STAGE_SECONDS = 1.0
+
+    def __init__(self, seconds=None):
+        self.seconds = seconds
+        self._expires = time.monotonic() + seconds if seconds else None
+        self._skipped = []
+        self._lock = threading.Lock()
+
+    def remaining(self):
+        if self._expires is None:
+            return float('inf')
+        return max(0.0, self._expires - time.monotonic())
+
+    def expired(self):
+        return self.remaining() <= 0
+
+    def timeout(self, cap, reserve=0):
+        """Timeout for the next stage: at most cap, never below MIN_STAGE_SECONDS"""
+        return max(self.MIN_STAGE_SECONDS, min(cap, self.remaining() - reserve))
+
+    def allows(self, stage, reserve=0):
+        """True if an optional stage still fits; otherwise records it as skipped"""
+        if self.remaining() - reserve >= self.MIN_STAGE_SECONDS:
+            return True
+        self.skip(stage)
+        return False
+
+    def skip(self, stage):
+        with self._lock:
+            if stage not in self._skipped:
+                self._skipped.append(stage)
+
+    @property
+    def skipped(self):
+        with self._lock:
+            return list(self._skipped)
@@ -0,0 +1,125 @@
+# app/utils/domain_registry.py
+
+import csv
+import json
+import os
+import threading
+from urllib.parse import urlparse
+
+from utils.config import Config
+
+
+class DomainRegistry:
+    """
+    Known-source reputation lookups keyed by registrable domain.
+
+    Ratings live in a flat dict, so a lookup walks the host's label
+    suffixes (news.bbc.co.uk -> bbc.co.uk -> co.uk) and costs O(labels).
+    Matches only happen on whole labels: cnn.com matches edition.cnn.com
+    but not notcnn.com or cnn.com.evil.io.
+    """
+
+    def __init__(self):
+        self._ratings = {}  # domain -> (score, category)
+        self._lock = threading.Lock()
+
+    def add(self, domain, score, category):
+        domain = normalize_host(domain)
+        if domain:
+            with self._lock:
+                self._ratings[domain] = (int(score), category)
+
+    def load_file(self, path):
+        """
+        Load ratings from a data file
+
+        JSON: {"credible": {"domain": score}, "unreliable": {...}}
+        CSV:  domain,score,category
+        """
+        ratings = {}
+
+        if path.endswith('.csv'):
+            with open(path, newline='', encoding='utf-8') as f:
+                for row in csv.reader(f):
+                    if len(row) < 3 or row[0].startswith('#') or row[0] == 'domain':
+                        continue
+                    domain = normalize_host(row[0])
+                    if domain:
+                        ratings[domain] = (int(row[1]), row[2].strip())
+        else:
+            with open(path, encoding='utf-8') as f:
+                data = json.load(f)
+            for category, domains in data.items():
+                for domain, score in domains.items():
+                    domain = normalize_host(domain)
+                    if domain:
+                        ratings[domain] = (int(score), category)
+
+        with self._lock:
+            self._ratings.update(ratings)
+
+        return len(ratings)
+
+    def lookup(self, host_or_url):
+        """Return the most specific rating covering this host, or None"""
+        host = normalize_host(host_or_url)
+        if not host:
+            return None
+
+        labels = host.split('.')
+        for i in range(len(labels)):
+            domain = '.'.join(labels[i:])
+            rating = self._ratings.get(domain)
+            if rating:
+                return {
+                    'domain': domain,
+                    'score': rating[0],
+                    'category': rating[1]
+                }
+
+        return None
+
+    def is_credible(self, host_or_url):
+        rating = self.lookup(host_or_url)
+        return bool(rating) and rating['category'] == 'credible'
+
+    def is_unreliable(self, host_or_url):
+        rating = self.lookup(host_or_url)
+        return bool(rating) and rating['category'] == 'unreliable'
+
+    def __len__(self):
+        return len(self._ratings)
+
+
+def normalize_host(host_or_url):
+    """Lowercase host with scheme, path, port, 'www.' and trailing dot removed"""
+    value = (host_or_url or '').strip().lower()
+    if '/' in value:
+        value = urlparse(value if '//' in value else f'//{value}').netloc
+    value = value.rsplit('@', 1)[-1].split(':', 1)[0].rstrip('.')
+    if value.startswith('www.'):
+        value = value[4:]
+    return value
+
+
+_registry = None
+_registry_lock = threading.Lock()
+
+
+def get_domain_registry():
+    """Process-wide registry, loaded once from Config.DOMAIN_RATINGS_FILES"""
+    global _registry
+
+    if _registry is None:
+        with _registry_lock:
+            if _registry is None:
+                registry = DomainRegistry()
+                for path in Config.DOMAIN_RATINGS_FILES:
+                    try:
+                        count = registry.load_file(path)
+                        print(f"✅ Loaded {count} domain ratings from {os.path.basename(path)}")
+                    except (OSError, ValueError) as e:
+                        print(f"⚠️ Could not load domain ratings from {path}: {e}")
+                _registry = registry
+
+    return _registry
@@ -0,0 +1,87 @@
+# app/utils/evidence_packer.py
+
+import re
+
+from utils.text import normalize_text, tokenize
+
+CHARS_PER_TOKEN = 4
+SENTENCE_END = re.compile(r'(?<=[.!?])\s+')
+
+
+def estimate_tokens(text):
+    """Rough token count (~4 characters per token), no API call"""
+    return len(text) // CHARS_PER_TOKEN + 1
+
+
+def truncate_to_tokens(text, max_tokens):
+    """Cut text to about max_tokens, at a sentence (or word) boundary when possible"""
+    text = ' '.join(text.split())
+    limit = max_tokens * CHARS_PER_TOKEN
+    if len(text) <= limit:
+        return text
+
+    cut = text[:limit]
+    sentences = SENTENCE_END.split(cut)
+    if len(sentences) > 1 and len(cut) - len(sentences[-1]) > limit // 2:
+        return cut[:len(cut) - len(sentences[-1])].rstrip()
+    return cut.rsplit(' ', 1)[0] + '...'
+
+
+class EvidencePacker:
+    """
+    Fits the best evidence into a prompt token budget.
+
+    Items are {'text', 'credibility' (0-100 or None), ...}; any other keys
+    are passed through. Each is ranked by relevance to the claim (share of
+    the claim's content words it mentions) weighted with source
+    credibility, near-duplicate texts are dropped, and items are taken
+    best first, each capped at max_item_tokens, until the budget is full.
+    """
+
+    def __init__(self, budget=600, max_item_tokens=125, credibility_weight=0.4):
+        self.budget = budget
+        self.max_item_tokens = max_item_tokens
+        self.credibility_weight = credibility_weight
+
+    def pack(self, claim, items):
+        """Return (packed items best first, report); packed texts may be truncated"""
+        claim_terms = set(tokenize(claim))
+
+        ranked = []
+        seen = set()
+        for item in items:
+            text = ' '.join((item.get('text') or '').split())
+            key = normalize_text(text)[:200]
+            if not key or key in seen:
+                continue
+            seen.add(key)
+
+            terms = set(tokenize(text))
+            relevance = len(claim_terms & terms) / len(claim_terms) if claim_terms else 0.0
+            credibility = item.get('credibility')
+            credibility = 0.5 if credibility is None else credibility / 100
+            score = (1 - self.credibility_weight) * relevance + self.credibility_weight * credibility
+            ranked.append((score, dict(item, text=text)))
+
+        ranked.sort(key=lambda entry: entry[0], reverse=True)
+
+        packed = []
+        used = 0
+        truncated = 0
+        for _, item in ranked:
+            room = min(self.max_item_tokens, self.budget - used)
+            if room < 20:
+                break
+            text = truncate_to_tokens(item['text'], room)
+            if text != item['text']:
+                truncated += 1
+            used += estimate_tokens(text)
+            packed.append(dict(item, text=text))
+
+        return packed, {
+            'budget': self.budget,
+            'evidence_tokens': used,
+            'items_total': len(items),
+            'items_packed': len(packed),
+            'items_truncated': truncated
+        }
@@ -0,0 +1,178 @@
+# app/utils/http_client.py
+
+import threading
+import time
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from utils.config import Config
+
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+MIN_ATTEMPT_SECONDS = 1.0
+
+
+class HttpClient:
+    """
+    Shared keep-alive HTTP client for all outbound calls.
+
+    One requests.Session with pooled adapters: the default adapter keeps
+    pools for up to `pool_hosts` hosts (scrapes fan out over many) with
+    `pool_size` connections each, plus per-host overrides (mounted by URL
+    prefix, one host each), urllib3 retries with
+    exponential backoff, and a default timeout for calls that omit one.
+
+    Calls made with `budget` (total seconds) go through a mirror set of
+    pools without adapter retries and are retried here instead, only
+    while another attempt still fits the budget - so a stage timeout
+    bounds the whole call, retries and backoff included.
+    """
+
+    def __init__(self, pool_size=None, host_pool_sizes=None, retries=None,
+                 backoff=None, timeout=None, pool_hosts=None):
+        self.timeout = timeout or Config.HTTP_TIMEOUT
+        self.session = requests.Session()
+        self.budget_session = requests.Session()
+        self._adapters = []
+        self._lock = threading.Lock()
+        self._host_stats = {}
+
+        retries = Config.HTTP_RETRIES if retries is None else retries
+        backoff = Config.HTTP_BACKOFF if backoff is None else backoff
+        self.retries = retries
+        self.backoff = backoff
+        self._retry = Retry(
+            total=retries,
+            connect=retries,
+            read=retries,
+            status=retries,
+            backoff_factor=backoff,
+            status_forcelist=RETRY_STATUSES,
+            allowed_methods=frozenset(['GET', 'HEAD', 'POST']),
+            raise_on_status=False
+        )
+
+        host_pool_sizes = Config.HTTP_HOST_POOL_SIZES if host_pool_sizes is None else host_pool_sizes
+        pool_hosts = pool_hosts or Config.HTTP_POOL_HOSTS
+        for session, retry in ((self.session, self._retry), (self.budget_session, 0)):
+            default_adapter = self._make_adapter(pool_hosts, pool_size or Config.HTTP_POOL_SIZE, retry)
+            session.mount('http://', default_adapter)
+            session.mount('https://', default_adapter)
+
+            for host, size in host_pool_sizes.items():
+                adapter = self._make_adapter(1, size, retry)
+                session.mount(f'https://{host}', adapter)
+                session.mount(f'http://{host}', adapter)
+
+    def request(self, method, url, timeout=None, budget=None, **kwargs):
+        """
+        Send a request through the shared pool, recording per-host stats
+
+        With `budget`, retries of connection errors, timeouts and
+        RETRY_STATUSES stop once the next attempt would not fit in it.
+        """
+        if budget is None:
+            return self._send(self.session, method, url, timeout or self.timeout, kwargs)
+
+        expires = time.monotonic() + budget
+        attempt = 0
+        while True:
+            remaining = expires - time.monotonic()
+            pause = self.backoff * (2 ** attempt)
+            can_retry = attempt < self.retries
+            try:
+                response = self._send(
+                    self.budget_session, method, url, min(timeout or self.timeout, remaining), kwargs
+                )
+            except (requests.ConnectionError, requests.Timeout):
+                remaining = expires - time.monotonic()
+                if not can_retry or remaining - pause < MIN_ATTEMPT_SECONDS:
+                    raise
+            else:
+                remaining = expires - time.monotonic()
+                if response.status_code not in RETRY_STATUSES or not can_retry \
+                        or remaining - pause < MIN_ATTEMPT_SECONDS:
+                    return response
+                response.close()
+
+            attempt += 1
+            time.sleep(pause)
+
+    def get(self, url, **kwargs):
+        return self.request('GET', url, **kwargs)
+
+    def post(self, url, **kwargs):
+        return self.request('POST', url, **kwargs)
+
+    def stats(self):
+        """Per-host request counters plus connection reuse from the pools"""
+        with self._lock:
+            hosts = {
+                host: dict(s, avg_latency_ms=round(s['total_seconds'] / s['requests'] * 1000, 1))
+                for host, s in self._host_stats.items()
+            }
+        for s in hosts.values():
+            del s['total_seconds']
+
+        connections = 0
+        pooled_requests = 0
+        for adapter in self._adapters:
+            pools = adapter.poolmanager.pools
+            for key in list(pools.keys()):
+                pool = pools.get(key)
+                if pool is not None:
+                    connections += pool.num_connections
+                    pooled_requests += pool.num_requests
+
+        return {
+            'hosts': hosts,
+            'connections_opened': connections,
+            'requests_sent': pooled_requests,
+            'connection_reuse_rate': round(1 - connections / pooled_requests, 3) if pooled_requests else 0.0
+        }
+
+    def _send(self, session, method, url, timeout, kwargs):
+        host = urlparse(url).netloc
+        start = time.monotonic()
+        try:
+            response = session.request(method, url, timeout=timeout, **kwargs)
+        except requests.RequestException:
+            self._record(host, time.monotonic() - start, error=True)
+            raise
+        self._record(host, time.monotonic() - start, error=response.status_code >= 400)
+        return response
+
+    def _make_adapter(self, hosts, size, retry):
+        # pool_connections is how many per-host pools are cached,
+        # pool_maxsize how many connections each of them keeps
+        adapter = HTTPAdapter(pool_connections=hosts, pool_maxsize=size, max_retries=retry)
+        self._adapters.append(adapter)
+        return adapter
+
+    def _record(self, host, seconds, error=False):
+        with self._lock:
+            s = self._host_stats.setdefault(
+                host, {'requests': 0, 'errors': 0, 'total_seconds': 0.0}
+            )
+            s['requests'] += 1
+            s['total_seconds'] += seconds
+            if error:
+                s['errors'] += 1
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_http_client():
+    """Process-wide HttpClient shared by services and routes"""
+    global _client
+
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = HttpClient()
+
+    return _client
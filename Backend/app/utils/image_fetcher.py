@@ -0,0 +1,144 @@
+# app/utils/image_fetcher.py
+
+import socket
+import threading
+import time
+
+from utils.article_store import canonicalize_url
+from utils.cache import SizedTTLCache, TTLCache
+from utils.image_payload import ImagePayload, InvalidImage
+
+# Magic-byte signatures of the formats we accept
+SIGNATURES = [
+    (b'\xff\xd8\xff', 'jpeg'),
+    (b'\x89PNG\r\n\x1a\n', 'png'),
+    (b'GIF87a', 'gif'),
+    (b'GIF89a', 'gif'),
+    (b'BM', 'bmp'),
+]
+
+
+class ImageFetchError(ValueError):
+    """Download rejected; `status` is the HTTP status to answer with"""
+
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.status = status
+
+
+def sniff_format(head):
+    """Real image format from the first bytes, or None"""
+    if head[:4] == b'RIFF' and head[8:12] == b'WEBP':
+        return 'webp'
+    for signature, fmt in SIGNATURES:
+        if head.startswith(signature):
+            return fmt
+    return None
+
+
+class ImageFetcher:
+    """
+    Bounded streaming downloads for /verify/image/url.
+
+    Headers are checked before the body is read (Content-Type must be an
+    image, Content-Length within max_bytes), the body is streamed and cut
+    off at max_bytes or after `fetch_timeout` seconds in total (retries
+    included), and the format is sniffed from magic bytes. Raw
+    bytes are cached by content hash under a total byte budget and URLs
+    map to that hash, so a popular image URL is downloaded once; the
+    decoded ImagePayload is rebuilt per request rather than kept around.
+    """
+
+    def __init__(self, http, max_bytes, url_ttl=3600, max_entries=50,
+                 cache_bytes=64 * 1024 * 1024, fetch_timeout=15):
+        self.http = http
+        self.max_bytes = max_bytes
+        self.fetch_timeout = fetch_timeout
+        self._urls = TTLCache(max_entries=max_entries * 10, ttl=url_ttl)
+        self._bodies = SizedTTLCache(cache_bytes, max_entries=max_entries, ttl=url_ttl)
+
+    def fetch(self, url):
+        """Return an ImagePayload for url, downloading only on a cache miss"""
+        key = canonicalize_url(url)
+        content_hash = self._urls.get(key)
+        if content_hash:
+            data = self._bodies.get(content_hash)
+            if data is not None:
+                return ImagePayload(data)
+
+        payload = self._download(url)
+
+        # Different URLs serving the same bytes share one cached body
+        self._bodies.set(payload.sha256, payload.data)
+        self._urls.set(key, payload.sha256)
+        return payload
+
+    def stats(self):
+        return {'urls': self._urls.stats(), 'bodies': self._bodies.stats()}
+
+    def _download(self, url):
+        started = time.monotonic()
+        response = self.http.get(
+            url, timeout=min(10, self.fetch_timeout), budget=self.fetch_timeout, stream=True
+        )
+        try:
+            if response.status_code != 200:
+                raise ImageFetchError(f'Failed to download image (HTTP {response.status_code})')
+
+            content_type = response.headers.get('Content-Type', '').split(';')[0].strip().lower()
+            if content_type and not content_type.startswith('image/') \
+                    and content_type != 'application/octet-stream':
+                raise ImageFetchError(f'URL is not an image ({content_type})', status=415)
+
+            length = response.headers.get('Content-Length')
+            if length and length.isdigit() and int(length) > self.max_bytes:
+                raise ImageFetchError(f'Image too large ({length} bytes)', status=413)
+
+            # Read timeouts apply per socket read, so a slow trickle could run
+            # on indefinitely; close the response once the total budget is spent
+            expired = threading.Event()
+
+            def expire():
+                expired.set()
+                # close() alone does not wake a reader blocked in recv()
+                sock = getattr(getattr(response.raw, 'connection', None), 'sock', None)
+                if sock is not None:
+                    try:
+                        sock.shutdown(socket.SHUT_RDWR)
+                    except OSError:
+                        pass
+                response.close()
+
+            remaining = self.fetch_timeout - (time.monotonic() - started)
+            watchdog = threading.Timer(max(remaining, 0), expire)
+            watchdog.daemon = True
+            watchdog.start()
+
+            chunks = []
+            received = 0
+            try:
+                for chunk in response.iter_content(chunk_size=65536):
+                    received += len(chunk)
+                    if received > self.max_bytes:
+                        raise ImageFetchError(f'Image exceeds {self.max_bytes} bytes', status=413)
+                    chunks.append(chunk)
+            except Exception:
+                if not expired.is_set():
+                    raise
+            finally:
+                watchdog.cancel()
+            if expired.is_set():
+                raise ImageFetchError(
+                    f'Image download took longer than {self.fetch_timeout}s', status=504
+                )
+        finally:
+            response.close()
+
+        data = b''.join(chunks)
+        if not sniff_format(data[:16]):
+            raise ImageFetchError('Unsupported or invalid image format', status=415)
+
+        try:
+            return ImagePayload(data)
+        except InvalidImage as e:
+            raise ImageFetchError(str(e))
@@ -0,0 +1,150 @@
+# app/utils/image_index.py
+
+import threading
+import time
+
+from PIL import Image
+
+from utils.cache import SQLiteTTLCache
+
+
+def dhash(image, size=8):
+    """64-bit difference hash: robust to rescaling, recompression and small edits"""
+    gray = image.convert('L').resize((size + 1, size), Image.LANCZOS)
+    pixels = list(gray.getdata())
+    value = 0
+    for row in range(size):
+        offset = row * (size + 1)
+        for col in range(size):
+            value = (value << 1) | (pixels[offset + col] > pixels[offset + col + 1])
+    return value
+
+
+def hamming(a, b):
+    return bin(a ^ b).count('1')
+
+
+class BKTree:
+    """Burkhard-Keller tree over integer hashes for Hamming-radius queries"""
+
+    def __init__(self):
+        self._root = None  # [hash, keys, {distance: child}]
+        self.size = 0
+
+    def add(self, value, key):
+        self.size += 1
+        if self._root is None:
+            self._root = [value, [key], {}]
+            return
+
+        node = self._root
+        while True:
+            distance = hamming(value, node[0])
+            if distance == 0:
+                node[1].append(key)
+                return
+            child = node[2].get(distance)
+            if child is None:
+                node[2][distance] = [value, [key], {}]
+                return
+            node = child
+
+    def search(self, value, radius):
+        """[(distance, key)] for every stored hash within radius"""
+        matches = []
+        stack = [self._root] if self._root else []
+        while stack:
+            node = stack.pop()
+            distance = hamming(value, node[0])
+            if distance <= radius:
+                matches.extend((distance, key) for key in node[1])
+            for child_distance, child in node[2].items():
+                if distance - radius <= child_distance <= distance + radius:
+                    stack.append(child)
+        return matches
+
+
+class ImageFingerprintIndex:
+    """
+    Verdict reuse for identical and near-duplicate images.
+
+    Verdicts are stored on disk keyed by the image's SHA-256 together with
+    its dHash. Lookups try the exact hash first, then a BK-tree search for
+    dHashes within `radius` bits. Expired entries drop out of the TTL
+    cache; the tree skips them and is rebuilt once they pile up.
+    """
+
+    def __init__(self, path, max_entries=2000, ttl=7 * 24 * 3600, radius=6):
+        self.radius = radius
+        self._cache = SQLiteTTLCache(
+            path,
+            table='image_verdicts',
+            max_entries=max_entries,
+            ttl=ttl,
+            max_disk_entries=max_entries * 10
+        )
+        self._lock = threading.Lock()
+        self._tree = BKTree()
+        self._stale = 0
+        self.exact_hits = 0
+        self.near_hits = 0
+        self._rebuild()
+
+    def lookup(self, image):
+        """Return (verdict, match info) for a cached duplicate of an ImagePayload, or None"""
+        entry = self._cache.get_entry(image.sha256)
+        if entry:
+            self.exact_hits += 1
+            return entry[0]['verdict'], {
+                'match': 'exact',
+                'hash_distance': 0,
+                'age_seconds': round(time.time() - entry[1])
+            }
+
+        value = dhash(image.image)
+        with self._lock:
+            matches = sorted(self._tree.search(value, self.radius))
+
+        for distance, key in matches:
+            entry = self._cache.get_entry(key)
+            if entry is None:
+                with self._lock:
+                    self._stale += 1
+                continue
+            self.near_hits += 1
+            return entry[0]['verdict'], {
+                'match': 'near_duplicate',
+                'hash_distance': distance,
+                'age_seconds': round(time.time() - entry[1])
+            }
+
+        return None
+
+    def add(self, image, verdict):
+        value = dhash(image.image)
+        self._cache.set(image.sha256, {'verdict': verdict, 'dhash': value})
+        with self._lock:
+            self._tree.add(value, image.sha256)
+            if self._stale > max(100, self._tree.size // 2):
+                self._rebuild_locked()
+
+    def stats(self):
+        stats = self._cache.stats()
+        stats.update({
+            'exact_hits': self.exact_hits,
+            'near_duplicate_hits': self.near_hits,
+            'indexed_hashes': self._tree.size,
+            'radius': self.radius
+        })
+        return stats
+
+    def _rebuild(self):
+        with self._lock:
+            self._rebuild_locked()
+
+    def _rebuild_locked(self):
+        tree = BKTree()
+        for key, value, _ in self._cache.disk_items():
+            tree.add(value['dhash'], key)
+        self._tree = tree
+        self._stale = 0
@@ -0,0 +1,97 @@
+# app/utils/image_payload.py
+
+import hashlib
+import io
+import threading
+
+from PIL import Image, ImageOps
+
+
+class InvalidImage(ValueError):
+    """Raised when uploaded bytes cannot be decoded as an image"""
+
+
+class ImagePayload:
+    """
+    An image received once, hashed once and decoded once.
+
+    Analyzers share this object read-only instead of reopening a file:
+    `data` holds the original bytes, `image` the decoded PIL image,
+    `sha256` the content hash. `normalized()` gives a downscaled,
+    re-encoded copy for uploads; EXIF analysis keeps using the original.
+    """
+
+    def __init__(self, data):
+        if not data:
+            raise InvalidImage('Empty image')
+
+        self.data = bytes(data)
+        self.size = len(self.data)
+        self.sha256 = hashlib.sha256(self.data).hexdigest()
+
+        try:
+            image = Image.open(io.BytesIO(self.data))
+            image.load()
+        except Exception as e:
+            raise InvalidImage(f'Could not decode image: {e}')
+
+        self.image = image
+        self.format = (image.format or 'JPEG').upper()
+        self.mime_type = Image.MIME.get(self.format, f'image/{self.format.lower()}')
+
+        self._normalized = {}
+        self._lock = threading.Lock()
+
+    def exif(self):
+        """Raw EXIF dict ({tag_id: value}) or None"""
+        getexif = getattr(self.image, '_getexif', None)
+        return getexif() if getexif else None
+
+    def normalized(self, max_dimension, fmt='JPEG', quality=85):
+        """
+        (bytes, mime_type) scaled to fit max_dimension and re-encoded
+
+        Computed once per setting and shared by all analyzers. The original
+        bytes are returned when max_dimension is 0, or when they are already
+        within bounds and no larger than the re-encoded version.
+        """
+        if not max_dimension:
+            return self.data, self.mime_type
+
+        key = (max_dimension, fmt.upper(), quality)
+        with self._lock:
+            if key not in self._normalized:
+                self._normalized[key] = self._encode(max_dimension, fmt.upper(), quality)
+            return self._normalized[key]
+
+    def blob(self, max_dimension=0, fmt='JPEG', quality=85):
+        """Inline-data part for Gemini, normalized when max_dimension is set"""
+        data, mime_type = self.normalized(max_dimension, fmt, quality)
+        return {'mime_type': mime_type, 'data': data}
+
+    def _encode(self, max_dimension, fmt, quality):
+        image = self.image
+        fits = max(image.size) <= max_dimension
+
+        # Bake EXIF orientation into the pixels - re-encoding drops the tag.
+        # exif_transpose returns a copy, so thumbnail() leaves self.image alone
+        image = ImageOps.exif_transpose(image)
+        if not fits:
+            image.thumbnail((max_dimension, max_dimension), Image.LANCZOS)
+
+        if fmt == 'JPEG' and image.mode not in ('RGB', 'L'):
+            if image.mode in ('RGBA', 'LA', 'P'):
+                image = image.convert('RGBA')
+                background = Image.new('RGB', image.size, (255, 255, 255))
+                background.paste(image, mask=image.getchannel('A'))
+                image = background
+            else:
+                image = image.convert('RGB')
+
+        buffer = io.BytesIO()
+        image.save(buffer, format=fmt, quality=quality, optimize=True)
+        data = buffer.getvalue()
+
+        if fits and len(self.data) <= len(data):
+            return self.data, self.mime_type
+        return data, Image.MIME.get(fmt, f'image/{fmt.lower()}')
@@ -0,0 +1,124 @@
+# app/utils/jobs.py
+
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+
+class JobQueueFull(Exception):
+    """Raised when unfinished jobs already reach max_pending or max_pending_bytes"""
+
+
+class JobManager:
+    """
+    Runs verification calls on a bounded background executor.
+
+    Jobs move through queued -> running -> done | failed. Finished jobs are
+    kept for `ttl` seconds after completion and then dropped; unfinished
+    jobs are capped at `max_pending`, and the payload bytes they hold
+    (the `size` given to submit) at `max_pending_bytes`, so bursts are
+    rejected, not queued without bound.
+
+    Job state is in-process only: a job can be polled only on the
+    instance that ran it. Serverless deployments disable async mode
+    (Config.ASYNC_JOBS_ENABLED).
+    """
+
+    def __init__(self, max_workers=4, max_pending=100, ttl=600, max_pending_bytes=None):
+        self.max_pending = max_pending
+        self.max_pending_bytes = max_pending_bytes
+        self.ttl = ttl
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='job')
+        self._jobs = {}
+        self._lock = threading.Lock()
+
+    def submit(self, kind, fn, *args, size=0, **kwargs):
+        """Queue fn(*args, **kwargs) and return the new job's public view"""
+        with self._lock:
+            self._expire()
+            pending = [job for job in self._jobs.values() if job['status'] in ('queued', 'running')]
+            if len(pending) >= self.max_pending:
+                raise JobQueueFull(f'{len(pending)} jobs already pending')
+            pending_bytes = sum(job['size'] for job in pending)
+            if self.max_pending_bytes and size and pending_bytes + size > self.max_pending_bytes:
+                raise JobQueueFull(f'{pending_bytes} bytes of payloads already pending')
+
+            job_id = uuid.uuid4().hex
+            job = {
+                'job_id': job_id,
+                'kind': kind,
+                'size': size,
+                'status': 'queued',
+                'created_at': time.time(),
+                'started_at': None,
+                'finished_at': None,
+                'result': None,
+                'error': None
+            }
+            self._jobs[job_id] = job
+
+        self._executor.submit(self._run, job, fn, args, kwargs)
+        return self._public(job)
+
+    def get(self, job_id):
+        """Public view of a job, or None if unknown or expired"""
+        with self._lock:
+            self._expire()
+            job = self._jobs.get(job_id)
+            return self._public(job) if job else None
+
+    def stats(self):
+        with self._lock:
+            self._expire()
+            counts = {}
+            for job in self._jobs.values():
+                counts[job['status']] = counts.get(job['status'], 0) + 1
+            pending_bytes = sum(
+                job['size'] for job in self._jobs.values() if job['status'] in ('queued', 'running')
+            )
+            return {
+                'jobs': counts,
+                'max_pending': self.max_pending,
+                'pending_bytes': pending_bytes,
+                'max_pending_bytes': self.max_pending_bytes,
+                'ttl': self.ttl
+            }
+
+    def _run(self, job, fn, args, kwargs):
+        with self._lock:
+            job['status'] = 'running'
+            job['started_at'] = time.time()
+
+        try:
+            result, error, status = fn(*args, **kwargs), None, 'done'
+        except Exception as e:
+            print(f"❌ Job {job['job_id']} failed: {e}")
+            result, error, status = None, str(e), 'failed'
+
+        with self._lock:
+            job.update(result=result, error=error, status=status, finished_at=time.time())
+
+    def _expire(self):
+        cutoff = time.time() - self.ttl
+        expired = [
+            job_id for job_id, job in self._jobs.items()
+            if job['finished_at'] and job['finished_at'] < cutoff
+        ]
+        for job_id in expired:
+            del self._jobs[job_id]
+
+    def _public(self, job):
+        view = {
+            'job_id': job['job_id'],
+            'kind': job['kind'],
+            'status': job['status'],
+            'created_at': job['created_at'],
+            'started_at': job['started_at'],
+            'finished_at': job['finished_at']
+        }
+        if job['status'] == 'done':
+            view['result'] = job['result']
+        elif job['status'] == 'failed':
+            view['error'] = job['error']
+        return view
@@ -0,0 +1,128 @@
+# app/utils/json_output.py
+
+import json
+import re
+
+FENCED_BLOCK = re.compile(r'```(?:json)?\s*(.*?)(?:```|$)', re.DOTALL | re.IGNORECASE)
+CLOSERS = {'{': '}', '[': ']'}
+MAX_REPAIR_ATTEMPTS = 50
+MAX_START_ATTEMPTS = 20
+
+
+class JSONOutputError(ValueError):
+    """Raised when model output contains no recoverable JSON"""
+
+    def __init__(self, message, end=None):
+        super().__init__(message)
+        self.end = end  # where a balanced but malformed value ends, if any
+
+
+def parse_json_output(text, expected=None):
+    """
+    Parse JSON from model output, tolerating the usual failure modes
+
+    Returns (value, repaired). Markdown fences and prose around the JSON
+    are ignored (the first object or array that parses is used), and output
+    cut off mid-way is closed at the last complete value. `repaired` is
+    True whenever the text was not valid JSON as-is. With `expected`
+    (dict or list) only values of that type are accepted.
+    """
+    text = (text or '').strip()
+    if not text:
+        raise JSONOutputError('Empty model output')
+
+    try:
+        value = json.loads(text)
+        if expected is None or isinstance(value, expected):
+            return value, False
+    except ValueError:
+        pass
+
+    fenced = FENCED_BLOCK.search(text)
+    if fenced and fenced.group(1).strip():
+        text = fenced.group(1).strip()
+
+    openers = {dict: '{', list: '['}.get(expected, ''.join(CLOSERS))
+    starts = [i for i, char in enumerate(text) if char in openers][:MAX_START_ATTEMPTS]
+    if not starts:
+        kind = f' {expected.__name__}' if expected else ''
+        raise JSONOutputError(f'No JSON{kind} found in model output: {text[:80]!r}')
+
+    # Prose may contain brackets too ("see [1]"): try each opener in turn.
+    # Openers inside a balanced value that failed to parse are skipped, so
+    # a fragment of broken JSON is never returned. An empty result is often
+    # a stray opener closed off by the repair, so it is only used when no
+    # later opener yields anything better.
+    empty = None
+    skip_to = 0
+    for start in starts:
+        if start < skip_to:
+            continue
+        try:
+            value = _scan(text, start)
+        except JSONOutputError as e:
+            error = e
+            skip_to = e.end or 0
+            continue
+        if value:
+            return value, True
+        if empty is None:
+            empty = value
+
+    if empty is not None:
+        return empty, True
+    raise error
+
+
+def _scan(text, start):
+    """First balanced JSON value from text[start:], repairing truncation"""
+    stack = []
+    cuts = []  # (position, open brackets) where the value can be closed off
+    in_string = False
+    escaped = False
+
+    for i in range(start, len(text)):
+        char = text[i]
+        if in_string:
+            if escaped:
+                escaped = False
+            elif char == '\\':
+                escaped = True
+            elif char == '"':
+                in_string = False
+            continue
+
+        if char == '"':
+            in_string = True
+        elif char in CLOSERS:
+            stack.append(char)
+            cuts.append((i + 1, list(stack)))
+        elif char in '}]':
+            if not stack:
+                break
+            stack.pop()
+            if not stack:
+                try:
+                    return json.loads(text[start:i + 1])
+                except ValueError as e:
+                    raise JSONOutputError(f'Malformed JSON in model output: {e}', end=i + 1)
+            cuts.append((i + 1, list(stack)))
+        elif char == ',':
+            cuts.append((i, list(stack)))
+
+    # Truncated output: close any open string, then the open brackets
+    tail = text[start:].rstrip()
+    if in_string:
+        tail += '"'
+    candidates = [(tail, stack)] + [
+        (text[start:position], brackets) for position, brackets in reversed(cuts)
+    ]
+
+    for body, brackets in candidates[:MAX_REPAIR_ATTEMPTS]:
+        body = body.rstrip().rstrip(',')
+        try:
+            return json.loads(body + ''.join(CLOSERS[b] for b in reversed(brackets)))
+        except ValueError:
+            continue
+
+    raise JSONOutputError('Truncated JSON in model output could not be repaired')
@@ -0,0 +1,92 @@
+# app/utils/knowledge_base.py
+
+import threading
+import time
+
+from utils.cache import SQLiteTTLCache
+from utils.text import normalize_text, tokenize
+from utils.text_index import BM25Index
+
+
+class ClaimKnowledgeBase:
+    """
+    Every verified claim with its verdict, evidence links and timestamp.
+
+    Records persist in SQLite; a BM25 index over the claim text is rebuilt
+    from disk at startup, kept current on every add and shrunk whenever
+    the store prunes expired or overflowing rows. `search` returns
+    the top-k related prior verdicts with a word-set (Jaccard) similarity
+    so callers can reuse a near-identical claim's verdict outright or feed
+    related ones to the model as evidence.
+    """
+
+    def __init__(self, path, max_entries=2000, max_disk_entries=50000,
+                 ttl=30 * 24 * 3600, min_coverage=0.5):
+        self.min_coverage = min_coverage
+        self._index = BM25Index()
+        self._cache = SQLiteTTLCache(
+            path,
+            table='verified_claims',
+            max_entries=max_entries,
+            ttl=ttl,
+            max_disk_entries=max_disk_entries,
+            on_evict=self._forget
+        )
+        self._lock = threading.Lock()
+        self._counters = {'searches': 0, 'related_hits': 0, 'added': 0}
+
+        for key, record, _ in self._cache.disk_items():
+            self._index.add(key, record['claim'])
+
+    def add(self, claim, verdict, evidence_links=()):
+        key = normalize_text(claim)
+        if not key:
+            return
+        self._cache.set(key, {
+            'claim': claim,
+            'verdict': verdict,
+            'evidence_links': list(evidence_links),
+            'verified_at': time.time()
+        })
+        self._index.add(key, claim)
+        with self._lock:
+            self._counters['added'] += 1
+
+    def search(self, claim, k=3):
+        """
+        Up to k prior records for related claims, best first
+
+        Each is {claim, verdict, evidence_links, verified_at, similarity};
+        claims sharing less than min_coverage of the query's words are left out.
+        """
+        tokens = set(tokenize(claim))
+        related = []
+        for key, _score, coverage in self._index.search(claim, k=k):
+            if coverage < self.min_coverage:
+                continue
+            record = self._cache.get_entry(key)
+            if record is None:
+                # Expired from the store - drop it from the index too
+                self._index.remove(key)
+                continue
+            terms = self._index.terms(key)
+            similarity = len(tokens & terms) / len(tokens | terms) if tokens | terms else 0.0
+            related.append(dict(record[0], similarity=similarity))
+
+        related.sort(key=lambda record: record['similarity'], reverse=True)
+        with self._lock:
+            self._counters['searches'] += 1
+            self._counters['related_hits'] += bool(related)
+        return related
+
+    def _forget(self, keys):
+        """Drop records the store has evicted from the index"""
+        for key in keys:
+            self._index.remove(key)
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._counters)
+        stats.update(self._cache.stats())
+        stats['indexed_claims'] = len(self._index)
+        return stats
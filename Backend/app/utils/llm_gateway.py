@@ -0,0 +1,247 @@
+# app/utils/llm_gateway.py
+
+import random
+import threading
+import time
+from collections import deque
+
+import google.generativeai as genai
+from google.api_core import exceptions as google_exceptions
+
+from utils.config import Config
+from utils.json_output import JSONOutputError, parse_json_output
+from utils.llm_schemas import missing_fields
+
+# Errors worth another attempt: quota, overload and transient server failures
+RETRYABLE_ERRORS = (
+    google_exceptions.ResourceExhausted,
+    google_exceptions.TooManyRequests,
+    google_exceptions.ServiceUnavailable,
+    google_exceptions.InternalServerError,
+    google_exceptions.DeadlineExceeded,
+)
+
+
+def response_usage(response):
+    """{'prompt_tokens', 'output_tokens'} as reported by the API, or {} if absent"""
+    usage = getattr(response, 'usage_metadata', None)
+    if not usage:
+        return {}
+    return {
+        'prompt_tokens': getattr(usage, 'prompt_token_count', 0) or 0,
+        'output_tokens': getattr(usage, 'candidates_token_count', 0) or 0
+    }
+
+
+class LLMUnavailable(Exception):
+    """Raised when a call cannot start before its deadline (rate limit or concurrency cap)"""
+
+
+class TokenBucket:
+    """Refills `rate` tokens per second up to `capacity`; acquire() waits for one"""
+
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = float(capacity)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, deadline):
+        """Take a token, waiting until the monotonic deadline at most; False on timeout"""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return True
+                wait = (1 - self._tokens) / self.rate
+
+            if now + wait > deadline:
+                return False
+            time.sleep(wait)
+
+    def available(self):
+        with self._lock:
+            elapsed = time.monotonic() - self._updated
+            return min(self.capacity, self._tokens + elapsed * self.rate)
+
+
+class LLMGateway:
+    """
+    The one way services call Gemini.
+
+    Every call takes a token from a bucket sized to our quota, holds a
+    slot of a process-wide semaphore while it runs, and must finish within
+    its deadline; each attempt gets the remaining time as its request
+    timeout. Quota and transient server errors are retried with full
+    jitter backoff while the deadline allows. Latency, retries, errors,
+    token usage and JSON parse failures are counted per call site.
+    """
+
+    LATENCY_WINDOW = 200
+
+    def __init__(self, model_name, rate_per_minute=60, burst=10, max_concurrent=8,
+                 timeout=30, retries=2, backoff=1.0):
+        self.model = genai.GenerativeModel(model_name)
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.max_concurrent = max_concurrent
+        self._bucket = TokenBucket(rate_per_minute / 60.0, burst)
+        self._slots = threading.BoundedSemaphore(max_concurrent)
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._sites = {}
+
+    def generate(self, call_site, contents, generation_config=None, timeout=None, **kwargs):
+        """generate_content() under the gateway's limits; raises on failure like the SDK"""
+        deadline = time.monotonic() + (timeout or self.timeout)
+        started = time.monotonic()
+        attempt = 0
+
+        try:
+            while True:
+                try:
+                    response = self._attempt(call_site, contents, generation_config, deadline, kwargs)
+                    self._record(call_site, started, 'ok', response_usage(response))
+                    return response
+                except RETRYABLE_ERRORS as e:
+                    pause = random.uniform(0, self.backoff * (2 ** attempt))
+                    if attempt >= self.retries or time.monotonic() + pause >= deadline:
+                        raise
+                    attempt += 1
+                    self._count(call_site, 'retries')
+                    print(f"⚠️ Gemini {call_site} retry {attempt} in {pause:.1f}s: {e}")
+                    time.sleep(pause)
+        except LLMUnavailable:
+            self._record(call_site, started, 'rejected')
+            raise
+        except Exception:
+            self._record(call_site, started, 'errors')
+            raise
+
+    def generate_json(self, call_site, contents, schema, generation_config=None, timeout=None):
+        """
+        generate() in JSON output mode; returns (parsed value, response)
+
+        The response is constrained to `schema`. Output that still is not
+        clean JSON goes through the tolerant parser. A value of the wrong
+        top-level type or missing required fields (e.g. a repaired,
+        truncated object) is unusable: it raises JSONOutputError and
+        counts as a parse failure, like output that cannot be recovered.
+        """
+        config = dict(
+            generation_config or {},
+            response_mime_type='application/json',
+            response_schema=schema
+        )
+        response = self.generate(call_site, contents, config, timeout)
+
+        expected = {'OBJECT': dict, 'ARRAY': list}.get(schema.get('type'))
+        try:
+            value, repaired = parse_json_output(response.text, expected)
+            missing = missing_fields(value, schema)
+            if missing:
+                raise JSONOutputError(f"missing required fields: {', '.join(missing[:5])}")
+        except ValueError as e:
+            # response.text itself raises ValueError when no candidate came back
+            self._count(call_site, 'parse_failures')
+            raise JSONOutputError(f'{call_site}: unusable output: {e}')
+
+        if repaired:
+            self._count(call_site, 'repaired_outputs')
+        return value, response
+
+    def stats(self):
+        with self._lock:
+            sites = {}
+            for name, site in self._sites.items():
+                latencies = sorted(site['latencies'])
+                sites[name] = {
+                    key: value for key, value in site.items() if key != 'latencies'
+                }
+                if latencies:
+                    sites[name]['latency_p50'] = round(latencies[len(latencies) // 2], 3)
+                    sites[name]['latency_p95'] = round(latencies[int(len(latencies) * 0.95)], 3)
+            return {
+                'in_flight': self._in_flight,
+                'max_concurrent': self.max_concurrent,
+                'tokens_available': round(self._bucket.available(), 2),
+                'call_sites': sites
+            }
+
+    def _attempt(self, call_site, contents, generation_config, deadline, kwargs):
+        if not self._bucket.acquire(deadline):
+            raise LLMUnavailable(f'{call_site}: rate limit wait exceeds deadline')
+
+        if not self._slots.acquire(timeout=max(0, deadline - time.monotonic())):
+            raise LLMUnavailable(f'{call_site}: no free Gemini slot before deadline')
+
+        try:
+            with self._lock:
+                self._in_flight += 1
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise LLMUnavailable(f'{call_site}: deadline passed before the call started')
+            return self.model.generate_content(
+                contents,
+                generation_config=generation_config,
+                request_options={'timeout': remaining},
+                **kwargs
+            )
+        finally:
+            with self._lock:
+                self._in_flight -= 1
+            self._slots.release()
+
+    def _site(self, call_site):
+        site = self._sites.get(call_site)
+        if site is None:
+            site = self._sites[call_site] = {
+                'calls': 0, 'ok': 0, 'errors': 0, 'rejected': 0, 'retries': 0,
+                'prompt_tokens': 0, 'output_tokens': 0,
+                'parse_failures': 0, 'repaired_outputs': 0,
+                'latencies': deque(maxlen=self.LATENCY_WINDOW)
+            }
+        return site
+
+    def _count(self, call_site, counter):
+        with self._lock:
+            self._site(call_site)[counter] += 1
+
+    def _record(self, call_site, started, outcome, usage=None):
+        with self._lock:
+            site = self._site(call_site)
+            site['calls'] += 1
+            site[outcome] += 1
+            for counter, count in (usage or {}).items():
+                site[counter] += count
+            site['latencies'].append(time.monotonic() - started)
+
+
+_gateway = None
+_gateway_lock = threading.Lock()
+
+
+def get_llm_gateway():
+    """Process-wide gateway configured from Config.GEMINI_* / LLM_* settings"""
+    global _gateway
+
+    if _gateway is None:
+        with _gateway_lock:
+            if _gateway is None:
+                genai.configure(api_key=Config.GEMINI_API_KEY)
+                _gateway = LLMGateway(
+                    Config.GEMINI_MODEL,
+                    rate_per_minute=Config.LLM_RATE_PER_MINUTE,
+                    burst=Config.LLM_BURST,
+                    max_concurrent=Config.LLM_MAX_CONCURRENT,
+                    timeout=Config.LLM_TIMEOUT,
+                    retries=Config.LLM_RETRIES,
+                    backoff=Config.LLM_BACKOFF
+                )
+
+    return _gateway
@@ -0,0 +1,119 @@
+# app/utils/llm_schemas.py
+
+# Response schemas for Gemini's JSON output mode (OpenAPI subset)
+
+STRING = {'type': 'STRING'}
+INTEGER = {'type': 'INTEGER'}
+BOOLEAN = {'type': 'BOOLEAN'}
+
+
+def one_of(*values):
+    return {'type': 'STRING', 'format': 'enum', 'enum': list(values)}
+
+
+def array_of(items):
+    return {'type': 'ARRAY', 'items': items}
+
+
+def object_of(properties, required=None):
+    """Object schema; every property is required unless listed otherwise"""
+    return {
+        'type': 'OBJECT',
+        'properties': properties,
+        'required': list(properties if required is None else required)
+    }
+
+
+def missing_fields(value, schema, path=''):
+    """Paths of required properties `value` lacks, walking nested objects and arrays"""
+    kind = schema.get('type')
+    if kind == 'OBJECT':
+        if not isinstance(value, dict):
+            return [path or '$']
+        missing = []
+        for name, prop in schema['properties'].items():
+            field = f'{path}.{name}' if path else name
+            if name not in value:
+                if name in schema.get('required', ()):
+                    missing.append(field)
+            else:
+                missing.extend(missing_fields(value[name], prop, field))
+        return missing
+    if kind == 'ARRAY':
+        if not isinstance(value, list):
+            return [path or '$']
+        missing = []
+        for i, item in enumerate(value):
+            missing.extend(missing_fields(item, schema['items'], f'{path}[{i}]'))
+        return missing
+    return []
+
+
+VERDICTS = ('TRUE', 'LIKELY TRUE', 'UNCERTAIN', 'LIKELY FALSE', 'FALSE')
+
+DOMAIN_RATING = object_of({
+    'credibility_score': INTEGER,
+    'category': one_of('credible', 'moderate', 'unreliable', 'unknown'),
+    'reasoning': STRING,
+    'red_flags': array_of(STRING),
+    'strengths': array_of(STRING)
+})
+
+DOMAIN_RATINGS_BATCH = object_of({
+    'ratings': array_of(object_of(dict({'domain': STRING}, **DOMAIN_RATING['properties'])))
+})
+
+CLAIM_VERDICT = object_of({
+    'verdict': one_of(*VERDICTS),
+    'credibility_score': INTEGER,
+    'confidence': INTEGER,
+    'reasoning': STRING,
+    'supporting_evidence': array_of(STRING),
+    'contradicting_evidence': array_of(STRING),
+    'credible_sources_found': array_of(STRING),
+    'red_flags': array_of(STRING),
+    'recommendation': STRING
+})
+
+URL_VERDICT = object_of({
+    'verdict': one_of(*VERDICTS),
+    'credibility_score': INTEGER,
+    'confidence': INTEGER,
+    'reasoning': STRING,
+    'source_assessment': STRING,
+    'content_quality': STRING,
+    'corroboration': STRING,
+    'red_flags': array_of(STRING)
+})
+
+EXTRACTED_CLAIMS = array_of(object_of({
+    'claim': STRING,
+    'subject': STRING,
+    'type': STRING,
+    'verifiable': BOOLEAN
+}))
+
+EVIDENCE_VERDICT_FIELDS = {
+    'verdict': one_of('TRUE', 'FALSE', 'UNCERTAIN'),
+    'confidence': INTEGER,
+    'reasoning': STRING,
+    'credible_sources': array_of(STRING),
+    'red_flags': array_of(STRING)
+}
+
+EVIDENCE_VERDICT = object_of(EVIDENCE_VERDICT_FIELDS)
+
+EVIDENCE_VERDICTS_BATCH = object_of({
+    'results': array_of(object_of(dict({'id': INTEGER}, **EVIDENCE_VERDICT_FIELDS)))
+})
+
+IMAGE_ANALYSIS = object_of({
+    'extracted_text': STRING,
+    'image_type': one_of('screenshot', 'meme', 'news', 'photo', 'other'),
+    'manipulation_detected': BOOLEAN,
+    'manipulation_signs': array_of(STRING),
+    'claims': array_of(STRING),
+    'credibility_score': INTEGER,
+    'red_flags': array_of(STRING),
+    'reasoning': STRING
+})
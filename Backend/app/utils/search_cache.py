@@ -0,0 +1,31 @@
+# app/utils/search_cache.py
+
+import threading
+
+from utils.cache import TTLCache
+from utils.config import Config
+from utils.text import normalize_text
+
+
+def search_cache_key(query, num=10, endpoint='search'):
+    """Queries that differ only in case, spacing or punctuation share a key"""
+    return f"{endpoint}:{num}:{normalize_text(query)}"
+
+
+_search_cache = None
+_search_cache_lock = threading.Lock()
+
+
+def get_search_cache():
+    """Process-wide cache of raw Serper responses, shared by all services"""
+    global _search_cache
+
+    if _search_cache is None:
+        with _search_cache_lock:
+            if _search_cache is None:
+                _search_cache = TTLCache(
+                    max_entries=Config.SEARCH_CACHE_MAX_ENTRIES,
+                    ttl=Config.SEARCH_CACHE_TTL
+                )
+
+    return _search_cache
@@ -0,0 +1,66 @@
+# app/utils/text.py
+
+import re
+import unicodedata
+
+_PUNCTUATION = re.compile(r'[^\w\s]+')
+_WHITESPACE = re.compile(r'\s+')
+
+
+def normalize_text(text):
+    """Case-fold, strip punctuation and collapse whitespace for cache keys"""
+    text = unicodedata.normalize('NFKC', text or '').casefold()
+    text = _PUNCTUATION.sub(' ', text)
+    return _WHITESPACE.sub(' ', text).strip()
+
+
+STOPWORDS = frozenset("""
+a an and are as at be been but by did do does for from had has have he her his
+i if in into is it its of on or our she so that the their them then there these
+they this to was we were what when which who will with would you your
+""".split())
+
+
+def tokenize(text):
+    """Normalized content words (stopwords dropped) for search indexes"""
+    return [token for token in normalize_text(text).split() if token not in STOPWORDS]
+
+
+NEGATIONS = frozenset("""
+not no never none nobody nothing nowhere neither nor without cannot
+isn aren wasn weren don doesn didn hasn haven hadn won wouldn shouldn couldn
+""".split())
+
+NUMBER_WORDS = frozenset("""
+zero one two three four five six seven eight nine ten eleven twelve twenty
+thirty forty fifty hundred thousand million billion trillion first second third
+""".split())
+
+_WORD = re.compile(r'\w+')
+_SENTENCE_END = '.!?'
+
+
+def key_terms(text):
+    """
+    Words that change what a claim asserts: negations, numbers and names
+
+    A name is a capitalised word that does not start a sentence, so
+    "Reports say..." does not make "reports" a key term.
+    """
+    text = unicodedata.normalize('NFKC', text or '')
+    terms = set()
+    for match in _WORD.finditer(text):
+        word = match.group()
+        token = word.casefold()
+        if token in NEGATIONS or token in NUMBER_WORDS or any(c.isdigit() for c in token):
+            terms.add(token)
+        elif word[0].isupper() and token not in STOPWORDS:
+            before = text[:match.start()].rstrip()
+            if before and before[-1] not in _SENTENCE_END:
+                terms.add(token)
+    return terms
+
+
+def differ_in_key_terms(tokens_a, terms_a, tokens_b, terms_b):
+    """True if two claims' word sets differ in any key term of either claim"""
+    return bool((set(tokens_a) ^ set(tokens_b)) & (set(terms_a) | set(terms_b)))
@@ -0,0 +1,84 @@
+# app/utils/text_index.py
+
+import math
+import threading
+
+from utils.text import tokenize
+
+
+class BM25Index:
+    """
+    Incremental inverted index with Okapi BM25 ranking.
+
+    Documents can be added at any time; IDF and length normalization use
+    the corpus statistics at query time, so nothing is rebuilt on ingest.
+    """
+
+    def __init__(self, k1=1.5, b=0.75):
+        self.k1 = k1
+        self.b = b
+        self._postings = {}   # term -> {doc_id: term frequency}
+        self._lengths = {}    # doc_id -> token count
+        self._terms = {}      # doc_id -> set of terms
+        self._total_length = 0
+        self._lock = threading.RLock()
+
+    def add(self, doc_id, text):
+        """Index text under doc_id (re-adding an id replaces it)"""
+        tokens = tokenize(text)
+        with self._lock:
+            if doc_id in self._lengths:
+                self.remove(doc_id)
+
+            counts = {}
+            for token in tokens:
+                counts[token] = counts.get(token, 0) + 1
+            for term, tf in counts.items():
+                self._postings.setdefault(term, {})[doc_id] = tf
+
+            self._lengths[doc_id] = len(tokens)
+            self._terms[doc_id] = set(counts)
+            self._total_length += len(tokens)
+
+    def remove(self, doc_id):
+        with self._lock:
+            for term in self._terms.pop(doc_id, ()):
+                postings = self._postings.get(term)
+                if postings:
+                    postings.pop(doc_id, None)
+                    if not postings:
+                        del self._postings[term]
+            self._total_length -= self._lengths.pop(doc_id, 0)
+
+    def search(self, query, k=5):
+        """Top-k [(doc_id, score, coverage)] where coverage is the share of query terms matched"""
+        terms = set(tokenize(query))
+        if not terms:
+            return []
+
+        with self._lock:
+            n = len(self._lengths)
+            if not n:
+                return []
+            avg_length = self._total_length / n or 1
+
+            scores = {}
+            matched = {}
+            for term in terms:
+                postings = self._postings.get(term)
+                if not postings:
+                    continue
+                idf = math.log(1 + (n - len(postings) + 0.5) / (len(postings) + 0.5))
+                for doc_id, tf in postings.items():
+                    norm = self.k1 * (1 - self.b + self.b * self._lengths[doc_id] / avg_length)
+                    scores[doc_id] = scores.get(doc_id, 0.0) + idf * tf * (self.k1 + 1) / (tf + norm)
+                    matched[doc_id] = matched.get(doc_id, 0) + 1
+
+        ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)[:k]
+        return [(doc_id, score, matched[doc_id] / len(terms)) for doc_id, score in ranked]
+
+    def terms(self, doc_id):
+        return self._terms.get(doc_id, set())
+
+    def __len__(self):
+        return len(self._lengths)
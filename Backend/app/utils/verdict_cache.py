@@ -0,0 +1,137 @@
+# app/utils/verdict_cache.py
+
+import hashlib
+import random
+import threading
+import time
+
+from utils.cache import TTLCache
+from utils.text import differ_in_key_terms, key_terms, normalize_text, tokenize
+
+_MERSENNE_PRIME = (1 << 61) - 1
+
+
+class MinHasher:
+    """MinHash signatures over a claim's content-word set"""
+
+    def __init__(self, num_perm=64, seed=1):
+        rng = random.Random(seed)
+        self.num_perm = num_perm
+        self._perms = [
+            (rng.randrange(1, _MERSENNE_PRIME), rng.randrange(0, _MERSENNE_PRIME))
+            for _ in range(num_perm)
+        ]
+
+    def signature(self, tokens):
+        hashes = [
+            int.from_bytes(hashlib.blake2b(token.encode('utf-8'), digest_size=8).digest(), 'big')
+            for token in tokens
+        ]
+        if not hashes:
+            return [0] * self.num_perm
+        return [
+            min((a * h + b) % _MERSENNE_PRIME for h in hashes)
+            for a, b in self._perms
+        ]
+
+
+class VerdictCache:
+    """
+    Verdict cache that also matches reworded claims.
+
+    Claims are keyed by their normalized text. Near-duplicates are found
+    with MinHash LSH (bands x rows of the signature) and confirmed by
+    exact Jaccard similarity over content words against `threshold`;
+    stopwords are dropped, so "sold as scrap" and "sold for scrap" count
+    as the same claim. Claims whose differing words include a negation, a
+    number or a name are never matched: "X has died" and "X has not
+    died" share almost every word but not a verdict.
+    """
+
+    def __init__(self, max_entries=2000, ttl=6 * 3600, threshold=0.9, bands=16, rows=4):
+        self.threshold = threshold
+        self.bands = bands
+        self.rows = rows
+        self._hasher = MinHasher(num_perm=bands * rows)
+        self._entries = TTLCache(max_entries=max_entries, ttl=ttl)
+        self._buckets = {}  # (band, band hash) -> set of keys
+        self._lock = threading.Lock()
+        self.near_hits = 0
+
+    def get(self, claim):
+        """Return (verdict, age_seconds, similarity) for the closest cached claim, or None"""
+        key = normalize_text(claim)
+        entry = self._entries.get_entry(key)
+        if entry:
+            return entry[0]['verdict'], time.time() - entry[1], 1.0
+
+        tokens = set(tokenize(claim))
+        if not tokens:
+            return None
+        terms = key_terms(claim)
+        best = None
+
+        for candidate in self._candidates(tokens):
+            entry = self._entries.peek(candidate)
+            if entry is None:
+                continue
+            if differ_in_key_terms(tokens, terms, entry[0]['tokens'], entry[0].get('key_terms', ())):
+                continue
+            similarity = _jaccard(tokens, set(entry[0]['tokens']))
+            if similarity >= self.threshold and (best is None or similarity > best[2]):
+                best = (entry[0]['verdict'], time.time() - entry[1], similarity)
+
+        if best:
+            self.near_hits += 1
+        return best
+
+    def set(self, claim, verdict):
+        key = normalize_text(claim)
+        tokens = sorted(set(tokenize(claim)))
+        self._entries.set(key, {
+            'verdict': verdict,
+            'tokens': tokens,
+            'key_terms': sorted(key_terms(claim))
+        })
+
+        if not tokens:
+            return
+
+        with self._lock:
+            for bucket in self._band_keys(tokens):
+                self._buckets.setdefault(bucket, set()).add(key)
+            if len(self._buckets) > self.bands * self._entries.max_entries * 2:
+                self._rebuild_buckets()
+
+    def stats(self):
+        stats = self._entries.stats()
+        stats['near_duplicate_hits'] = self.near_hits
+        stats['threshold'] = self.threshold
+        return stats
+
+    def _candidates(self, tokens):
+        candidates = set()
+        with self._lock:
+            for bucket in self._band_keys(tokens):
+                candidates.update(self._buckets.get(bucket, ()))
+        return candidates
+
+    def _band_keys(self, tokens):
+        signature = self._hasher.signature(tokens)
+        return [
+            (band, hash(tuple(signature[band * self.rows:(band + 1) * self.rows])))
+            for band in range(self.bands)
+        ]
+
+    def _rebuild_buckets(self):
+        """Drop bucket entries for claims the TTL cache has already evicted"""
+        self._buckets = {}
+        for key, value in self._entries.items():
+            for bucket in self._band_keys(value['tokens']):
+                self._buckets.setdefault(bucket, set()).add(key)
+
+
+def _jaccard(a, b):
+    if not a and not b:
+        return 1.0
+    return len(a & b) / len(a | b)
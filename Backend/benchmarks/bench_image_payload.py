@@ -0,0 +1,116 @@
+"""
+Benchmark: image payload size and latency vs normalization settings
+
+Usage:
+    python benchmarks/bench_image_payload.py <dir of images>
+        [--dimensions 0,1024,1600,2048] [--formats JPEG,WEBP] [--qualities 75,85]
+        [--live]
+
+For every setting reports the mean uploaded bytes, the base64 Serper body
+size and the CPU time spent normalizing. Dimension 0 means "send the
+original bytes" (the old behaviour). With --live (needs GEMINI_API_KEY and
+SERPER_API_KEY) it also times the Gemini vision call and the reverse search
+end to end for each setting.
+"""
+
+import argparse
+import base64
+import os
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / 'app'))
+
+from utils.config import Config
+from utils.image_payload import ImagePayload
+
+IMAGE_SUFFIXES = {'.jpg', '.jpeg', '.png', '.webp', '.gif', '.bmp'}
+
+
+def payload_for(image, dimension, fmt, quality):
+    image._normalized.clear()
+    return image.normalized(dimension, fmt, quality)
+
+
+def timed_live_call(service, image, dimension, fmt, quality):
+    """Wall-clock seconds for Gemini analysis and reverse search at one setting"""
+    Config.IMAGE_MAX_DIMENSION = dimension
+    Config.IMAGE_UPLOAD_FORMAT = fmt
+    Config.IMAGE_UPLOAD_QUALITY = quality
+    image._normalized.clear()
+
+    start = time.perf_counter()
+    service._analyze_with_gemini(image)
+    gemini = time.perf_counter() - start
+
+    start = time.perf_counter()
+    service._reverse_search_serper(image)
+    reverse = time.perf_counter() - start
+    return gemini, reverse
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('images', type=Path)
+    parser.add_argument('--dimensions', default='0,1024,1600,2048')
+    parser.add_argument('--formats', default='JPEG,WEBP')
+    parser.add_argument('--qualities', default='75,85')
+    parser.add_argument('--live', action='store_true')
+    args = parser.parse_args()
+
+    files = sorted(p for p in args.images.iterdir() if p.suffix.lower() in IMAGE_SUFFIXES)
+    if not files:
+        sys.exit(f"No images found in {args.images}")
+
+    images = [ImagePayload(p.read_bytes()) for p in files]
+    print(f"{len(images)} images, mean original size "
+          f"{sum(i.size for i in images) / len(images) / 1024:.0f} KB\n")
+
+    service = None
+    if args.live:
+        if not (os.getenv('GEMINI_API_KEY') and os.getenv('SERPER_API_KEY')):
+            sys.exit("--live needs GEMINI_API_KEY and SERPER_API_KEY")
+        from services.image_verification_service import ImageVerificationService
+        service = ImageVerificationService()
+
+    header = f"{'max dim':>8} {'format':>6} {'q':>4} {'payload KB':>11} {'base64 KB':>10} {'encode ms':>10}"
+    if service:
+        header += f" {'gemini s':>9} {'reverse s':>10}"
+    print(header)
+
+    settings = [(0, 'orig', 0)] + [
+        (int(d), f.upper(), int(q))
+        for d in args.dimensions.split(',') if int(d)
+        for f in args.formats.split(',')
+        for q in args.qualities.split(',')
+    ]
+
+    for dimension, fmt, quality in settings:
+        sizes, encoded, seconds = 0, 0, 0.0
+        for image in images:
+            start = time.process_time()
+            data, _ = payload_for(image, dimension, fmt, quality)
+            seconds += time.process_time() - start
+            sizes += len(data)
+            encoded += len(base64.b64encode(data))
+
+        n = len(images)
+        line = (f"{dimension or 'orig':>8} {fmt:>6} {quality or '-':>4} {sizes / n / 1024:11.0f} "
+                f"{encoded / n / 1024:10.0f} {seconds / n * 1000:10.1f}")
+
+        if service:
+            totals = [0.0, 0.0]
+            for image in images:
+                gemini, reverse = timed_live_call(
+                    service, image, dimension, 'JPEG' if fmt == 'orig' else fmt, quality or 85
+                )
+                totals[0] += gemini
+                totals[1] += reverse
+            line += f" {totals[0] / n:9.2f} {totals[1] / n:10.2f}"
+
+        print(line)
+
+
+if __name__ == '__main__':
+    main()
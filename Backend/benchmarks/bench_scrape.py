@@ -0,0 +1,140 @@
+"""
+Benchmark: streaming ArticleExtractor vs the old BeautifulSoup extractor
+
+Usage:
+    python benchmarks/bench_scrape.py [<dir of saved .html pages>] [--repeat N] [--max-bytes N]
+
+Save a corpus first, e.g. `curl -s <article url> -o corpus/reuters-1.html`.
+Reports per-page CPU time, peak Python memory, bytes consumed and whether
+both extractors produced the same title/content. The built-in PARITY_CASES
+(edge cases such as unclosed paragraphs) are checked on every run.
+"""
+
+import argparse
+import re
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / 'app'))
+
+from utils.article_extractor import extract_article
+
+
+# (html, expected content) - markup the streaming extractor must handle
+PARITY_CASES = [
+    ('<article><p>one</p><p>two</p></article>', 'one two'),
+    ('<article><p>one<p>two</article>', 'one two'),
+    ('<article><p>one<div><p>two</article><p>outside</p>', 'one two'),
+    ('<article><article><p>inner</p></article><p>outer</article>', 'inner outer'),
+    ('<div class="post-body"><p>one<p>two</div><p>outside</p>', 'one two'),
+    ('<div class="content"><article><p>one<p>two</article></div>', 'one two'),
+    ('<p>one<p>two', 'one two'),
+    ('<article><p>one<script>skip()</script> two</article>', 'one two'),
+]
+
+
+def check_parity_cases():
+    """Run PARITY_CASES through extract_article; returns the number of failures"""
+    failures = 0
+    for html, expected in PARITY_CASES:
+        _, content, _ = extract_article(SavedResponse(html.encode('utf-8')), max_bytes=1024 * 1024)
+        if content != expected:
+            failures += 1
+            print(f"✗ {html!r}: expected {expected!r}, got {content!r}")
+    print(f"parity cases: {len(PARITY_CASES) - failures}/{len(PARITY_CASES)} ok\n")
+    return failures
+
+
+def legacy_extract(html_bytes):
+    """The pre-streaming _scrape_single_url parsing logic"""
+    from bs4 import BeautifulSoup
+
+    soup = BeautifulSoup(html_bytes, 'html.parser')
+    for script in soup(["script", "style"]):
+        script.decompose()
+
+    title = soup.find('title')
+    title_text = title.get_text().strip() if title else ''
+
+    article = soup.find('article')
+    if not article:
+        article = soup.find('div', class_=re.compile('article|content|post'))
+
+    if article:
+        paragraphs = article.find_all('p')
+    else:
+        paragraphs = soup.find_all('p')
+
+    text_content = ' '.join([p.get_text().strip() for p in paragraphs[:10]])
+    text_content = re.sub(r'\s+', ' ', text_content).strip()
+    return title_text, text_content[:2000], len(html_bytes)
+
+
+class SavedResponse:
+    """Minimal stand-in for a streamed requests.Response"""
+
+    def __init__(self, body):
+        self.body = body
+        self.headers = {'Content-Type': 'text/html'}
+        self.encoding = None
+
+    def iter_content(self, chunk_size):
+        for i in range(0, len(self.body), chunk_size):
+            yield self.body[i:i + chunk_size]
+
+
+def measure(fn, repeat):
+    tracemalloc.start()
+    start = time.process_time()
+    for _ in range(repeat):
+        result = fn()
+    elapsed = (time.process_time() - start) / repeat
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return result, elapsed, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('corpus', type=Path, nargs='?')
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--max-bytes', type=int, default=1024 * 1024)
+    args = parser.parse_args()
+
+    failures = check_parity_cases()
+    if args.corpus is None:
+        sys.exit(1 if failures else 0)
+
+    pages = sorted(args.corpus.glob('*.htm*'))
+    if not pages:
+        sys.exit(f"No .html files found in {args.corpus}")
+
+    print(f"{'page':32} {'old ms':>8} {'new ms':>8} {'old KB':>8} {'new KB':>8} "
+          f"{'bytes read':>12} {'same':>5}")
+
+    totals = [0.0, 0.0, 0, 0]
+    for page in pages:
+        body = page.read_bytes()
+        old, old_t, old_mem = measure(lambda: legacy_extract(body), args.repeat)
+        new, new_t, new_mem = measure(
+            lambda: extract_article(SavedResponse(body), max_bytes=args.max_bytes), args.repeat
+        )
+        same = old[:2] == new[:2]
+        totals[0] += old_t
+        totals[1] += new_t
+        totals[2] += old_mem
+        totals[3] += new_mem
+        print(f"{page.name[:32]:32} {old_t * 1000:8.1f} {new_t * 1000:8.1f} "
+              f"{old_mem / 1024:8.0f} {new_mem / 1024:8.0f} "
+              f"{new[2]:>5}/{len(body):<6} {'yes' if same else 'no':>5}")
+
+    count = len(pages)
+    print(f"\nmean over {count} pages: old {totals[0] / count * 1000:.1f} ms / "
+          f"{totals[2] / count / 1024:.0f} KB, new {totals[1] / count * 1000:.1f} ms / "
+          f"{totals[3] / count / 1024:.0f} KB")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,5 @@
+import sys
+from pathlib import Path
+
+# The app imports its modules as top-level packages (utils, services)
+sys.path.insert(0, str(Path(__file__).parent.parent / 'app'))
@@ -0,0 +1,56 @@
+import json
+import time
+
+from utils.claimreview_index import ClaimReviewIndex
+
+LONG_REVIEW = (
+    'Viral posts claim that President Joe Biden did not die in hospital on Tuesday '
+    'after a secret medical emergency covered up by the White House'
+)
+
+
+def make_index():
+    index = ClaimReviewIndex()
+    index.add_review({'claim': LONG_REVIEW, 'rating': 'False', 'publisher': 'A', 'url': 'https://a.example/1'})
+    index.add_review({
+        'claim': 'The Eiffel Tower was sold for scrap metal in 1925',
+        'rating': 'False', 'publisher': 'B', 'url': 'https://b.example/1'
+    })
+    return index
+
+
+def test_short_or_contradicting_queries_do_not_match_long_reviews():
+    index = make_index()
+    assert index.search('Biden Tuesday hospital') == []
+    assert index.search('Joe Biden died on Tuesday') == []
+
+
+def test_close_rewording_matches():
+    index = make_index()
+    results = index.search('Eiffel Tower sold for scrap metal in 1925')
+    assert [r['publisher'] for r in results] == ['B']
+
+
+def test_results_are_capped():
+    index = ClaimReviewIndex(max_reviews=3)
+    for i in range(10):
+        index.add_review({
+            'claim': 'The Eiffel Tower was sold for scrap metal in 1925',
+            'rating': 'False', 'publisher': f'P{i}', 'url': f'https://p.example/{i}'
+        })
+    assert len(index.search('The Eiffel Tower was sold for scrap metal in 1925')) == 3
+
+
+def test_rescan_runs_off_the_request_thread(tmp_path):
+    index = ClaimReviewIndex(dumps_dir=str(tmp_path), rescan_seconds=0)
+    (tmp_path / 'dump.jsonl').write_text(json.dumps({
+        'text': 'The Eiffel Tower was sold for scrap metal in 1925',
+        'claimReview': [{'textualRating': 'False', 'url': 'https://c.example/1'}]
+    }) + '\n')
+
+    index.search('anything')  # starts the background rescan
+    for _ in range(50):
+        if index.stats()['reviews_ingested']:
+            break
+        time.sleep(0.05)
+    assert index.stats()['reviews_ingested'] == 1
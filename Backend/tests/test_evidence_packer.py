@@ -0,0 +1,71 @@
+from utils.config import Config
+from utils.evidence_packer import EvidencePacker, estimate_tokens, truncate_to_tokens
+
+CLAIM = 'The city council approved the new budget for public transport in 2024'
+
+SEARCH_RESULTS = [
+    {
+        'source': f'news{i}.example.com',
+        'title': f'Council approves transport budget, report {i} of the week',
+        'snippet': f'Result {i}: the city council voted on the 2024 public transport budget '
+                   'after a long debate about bus routes, fares and new tram lines in the centre.'
+    }
+    for i in range(10)
+]
+
+ARTICLES = [
+    {
+        'source': f'paper{i}.example.com',
+        'title': f'Transport budget passes, article {i}',
+        'content': ' '.join(
+            f'Sentence {n} of article {i} discusses how the council approved the budget.'
+            for n in range(40)
+        )
+    }
+    for i in range(3)
+]
+
+
+def old_text_evidence():
+    """Evidence slices the text verdict prompt used before packing"""
+    search = '\n'.join(
+        f"- [{r['source']}] {r['title']}: {r['snippet'][:150]}" for r in SEARCH_RESULTS[:5]
+    )
+    articles = '\n\n'.join(
+        f"Source: {s['source']}\nTitle: {s['title']}\nContent: {s['content'][:500]}..."
+        for s in ARTICLES
+    )
+    return search + articles
+
+
+def old_url_evidence():
+    article = ARTICLES[0]['content'][:1500]
+    titles = '\n'.join(f"- [{r['source']}] {r['title']}" for r in SEARCH_RESULTS[:5])
+    return article + titles
+
+
+def test_text_evidence_no_larger_than_old_slices():
+    packer = EvidencePacker(Config.EVIDENCE_TOKEN_BUDGET, Config.EVIDENCE_ITEM_MAX_TOKENS)
+    evidence, report = packer.pack(CLAIM, [
+        {'kind': 'article', 'source': s['source'], 'text': f"{s['title']}. {s['content']}"}
+        for s in ARTICLES
+    ] + [
+        {'kind': 'search', 'source': r['source'], 'text': f"{r['title']}: {r['snippet']}"}
+        for r in SEARCH_RESULTS
+    ])
+    packed = '\n'.join(f"- [{e['source']}] {e['text']}" for e in evidence)
+
+    assert report['evidence_tokens'] <= Config.EVIDENCE_TOKEN_BUDGET
+    assert estimate_tokens(packed) <= estimate_tokens(old_text_evidence())
+
+
+def test_url_evidence_no_larger_than_old_slices():
+    packer = EvidencePacker(Config.URL_EVIDENCE_TOKEN_BUDGET, Config.URL_EVIDENCE_ITEM_MAX_TOKENS)
+    evidence, _ = packer.pack(ARTICLES[0]['title'], [
+        {'source': r['source'], 'text': f"{r['title']}: {r['snippet']}"} for r in SEARCH_RESULTS
+    ])
+    article = truncate_to_tokens(ARTICLES[0]['content'], Config.ARTICLE_TOKEN_BUDGET)
+    packed = article + '\n'.join(f"- [{e['source']}] {e['text']}" for e in evidence)
+
+    assert evidence
+    assert estimate_tokens(packed) <= estimate_tokens(old_url_evidence())
@@ -0,0 +1,18 @@
+import threading
+
+import pytest
+
+from utils.jobs import JobManager, JobQueueFull
+
+
+def test_pending_payload_bytes_are_bounded():
+    release = threading.Event()
+    jobs = JobManager(max_workers=1, max_pending=100, max_pending_bytes=100)
+
+    jobs.submit('image', release.wait, size=60)
+    with pytest.raises(JobQueueFull):
+        jobs.submit('image', release.wait, size=60)
+    jobs.submit('text', release.wait)  # jobs without a payload are not limited by bytes
+    assert jobs.stats()['pending_bytes'] == 60
+
+    release.set()
@@ -0,0 +1,33 @@
+import pytest
+
+from utils import llm_schemas
+from utils.json_output import JSONOutputError, parse_json_output
+
+
+def test_clean_json_is_not_repaired():
+    assert parse_json_output('{"a": 1}', dict) == ({'a': 1}, False)
+
+
+def test_skips_values_of_the_wrong_type():
+    assert parse_json_output('see [1] then {"a":1}', dict) == ({'a': 1}, True)
+    assert parse_json_output('{"a": 1} or [1]', list) == ([1], True)
+    assert parse_json_output('Here is [the] answer: {"a":1}') == ({'a': 1}, True)
+
+
+def test_wrong_type_only_raises():
+    with pytest.raises(JSONOutputError):
+        parse_json_output('[1, 2]', dict)
+
+
+def test_truncated_output_is_closed():
+    assert parse_json_output('```json\n{"a": [1, 2', dict) == ({'a': [1, 2]}, True)
+
+
+def test_missing_fields_walks_nested_schemas():
+    truncated = {'verdict': 'TRUE', 'confidence': 80}
+    assert llm_schemas.missing_fields(truncated, llm_schemas.EVIDENCE_VERDICT) == [
+        'reasoning', 'credible_sources', 'red_flags'
+    ]
+    batch = {'ratings': [{'domain': 'example.com', 'credibility_score': 50}]}
+    assert 'ratings[0].category' in llm_schemas.missing_fields(batch, llm_schemas.DOMAIN_RATINGS_BATCH)
+    assert llm_schemas.missing_fields([1], llm_schemas.EVIDENCE_VERDICT) == ['$']
@@ -0,0 +1,24 @@
+from utils.cache import SQLiteTTLCache
+from utils.knowledge_base import ClaimKnowledgeBase
+
+
+def test_pruned_rows_leave_the_index(tmp_path, monkeypatch):
+    monkeypatch.setattr(SQLiteTTLCache, 'PRUNE_EVERY', 1)
+    kb = ClaimKnowledgeBase(str(tmp_path / 'kb.sqlite'), max_entries=5, max_disk_entries=5)
+
+    for i in range(20):
+        kb.add(f'Claim number {i} about the harbour bridge', {'verdict': 'TRUE'})
+
+    assert kb.stats()['indexed_claims'] == 5
+    assert kb.stats()['disk_entries'] == 5
+
+
+def test_memory_only_evictions_leave_the_index(tmp_path):
+    blocked = tmp_path / 'not-a-dir'
+    blocked.write_text('')
+    kb = ClaimKnowledgeBase(str(blocked / 'kb.sqlite'), max_entries=3)
+
+    for i in range(10):
+        kb.add(f'Claim number {i} about the harbour bridge', {'verdict': 'TRUE'})
+
+    assert kb.stats()['indexed_claims'] == 3
@@ -0,0 +1,34 @@
+import os
+
+import pytest
+
+pytest.importorskip('flask')
+os.environ.setdefault('GEMINI_API_KEY', 'test-key')
+
+from flask import Flask  # noqa: E402
+
+import routes  # noqa: E402
+
+
+def test_closing_stream_closes_the_pipeline():
+    closed = []
+
+    def events():
+        try:
+            yield 'search', {'count': 1}
+            yield 'sources', {'count': 0}
+            yield 'verdict', {'verdict': 'TRUE'}
+        finally:
+            closed.append(True)
+
+    # Held here, so only an explicit close (not garbage collection) counts
+    pipeline = events()
+    app = Flask(__name__)
+    with app.test_request_context('/verify/text/stream'):
+        response = routes.sse_response(pipeline)
+        body = iter(response.response)
+        assert next(body).startswith('event: search')
+        response.close()
+
+    assert closed == [True]
+    assert pipeline.gi_frame is None
@@ -0,0 +1,36 @@
+from utils.text import key_terms
+from utils.verdict_cache import VerdictCache
+
+CLAIM = 'The Eiffel Tower was sold for scrap metal in 1925'
+
+
+def make_cache():
+    cache = VerdictCache()
+    cache.set(CLAIM, {'verdict': 'FALSE'})
+    return cache
+
+
+def test_paraphrase_hits_cache():
+    cache = make_cache()
+    for paraphrase in (
+        'The Eiffel Tower was sold as scrap metal in 1925',
+        'Eiffel Tower sold for scrap metal in 1925',
+    ):
+        hit = cache.get(paraphrase)
+        assert hit is not None, paraphrase
+        assert hit[0] == {'verdict': 'FALSE'}
+        assert hit[2] == 1.0
+    assert cache.stats()['near_duplicate_hits'] == 2
+
+
+def test_different_claims_are_rejected():
+    cache = make_cache()
+    assert cache.get('The Eiffel Tower was not sold for scrap metal in 1925') is None
+    assert cache.get('The Eiffel Tower was sold for scrap metal in 1926') is None
+    assert cache.get('The Blackpool Tower was sold for scrap metal in 1925') is None
+
+
+def test_sentence_initial_word_is_not_a_key_term():
+    assert key_terms('Reports say the Eiffel Tower was sold') == {'eiffel', 'tower'}
+    assert 'paris' in key_terms('It was sold. Then Paris bought it back')
+    assert 'then' not in key_terms('It was sold. Then Paris bought it back')